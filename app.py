@@ -1,47 +1,44 @@
 import streamlit as st
 # Ganz am Anfang: breites Layout für die gesamte App
 st.set_page_config(
-    page_title="Fitness App",
+    page_title="UniFit Coach",
+    page_icon="💪",
     layout="wide",          # das sorgt dafür, dass alles breit angezeigt wird
     initial_sidebar_state="expanded"
 )
-import sqlite3
-import hashlib
-import re  # password + email checks
-import pandas as pd  # demo chart on Progress page
 import base64  # for background image + logo
 
-import workout_planner  # teammates' workout builder
-import workout_calendar  # teammates' calendar
-import calorie_tracker   # ML-based calorie & protein tracker
-import nutrition_advisory
-import calories_nutrition
-from nutrition_advisory import main as nutrition_main, load_and_prepare_data, DATA_URL
+# database.py owns the shared connection, the schema, the auth helpers and the profile cache
+from database import (
+    create_tables,
+    current_profile as database_current_profile,
+    get_profile,
+    is_valid_email,
+    register_user,
+    reset_password,
+    update_profile,
+    validate_password_strength,
+    verify_user,
+)
 
-# DataFrame nur einmal beim App-Start laden
-if "recipes_df" not in st.session_state:
-    with st.spinner("Loading recipe data..."):
-        st.session_state.recipes_df = load_and_prepare_data(DATA_URL)
+# The page modules (and pandas) are imported inside the page functions below:
+# the login screens need none of them, so a cold start only pays for what is opened.
 
 
-# ---------- basic page setup ----------
-st.set_page_config(
-    page_title="UniFit Coach",
-    page_icon="💪",
-    layout="wide",
-)
-
 # ---------- colors ----------
 PRIMARY_GREEN = "#007A3D"  # approx. HSG green
 
 
 # ---------- helper: load image as base64 for login background ----------
+# app.py re-runs top to bottom on every interaction; the images are read and encoded once
+@st.cache_resource
 def get_base64_of_image(path: str) -> str:
     """Read a local image file and return it as base64 string."""
     with open(path, "rb") as f:
         return base64.b64encode(f.read()).decode()
 
 
+@st.cache_resource
 def load_logo(path: str) -> str:
     """Load logo and return as base64 string for embedding in HTML."""
     try:
@@ -56,393 +53,93 @@ BACKGROUND_IMAGE = get_base64_of_image("background_pitch.jpg")
 LOGO_IMAGE = load_logo("unifit_logo.png")
 
 
-# ---------- GLOBAL CSS (theme) ----------
-st.markdown(
-    f"""
-    <style>
-    /* main app container: max-width removed so pages can be full width */
-    .block-container {{
-        padding-top: 2rem;
-        padding-bottom: 2rem;
-        max-width: 100% !important;
-        margin: 0 auto !important;
-        padding-left: 2rem;
-        padding-right: 2rem;
-    }}
-
-    /* white background + green text for header bar */
-    [data-testid="stHeader"] {{
-        background-color: #FFFFFF !important;
-        color: {PRIMARY_GREEN};
-        box-shadow: none !important;
-    }}
-
-    /* generic buttons in main area (Login, Save profile, etc.) */
-    .stButton > button {{
-        border-radius: 999px;
-        background-color: {PRIMARY_GREEN};
-        color: #ffffff;
-        border: 1px solid {PRIMARY_GREEN};
-        padding: 0.5rem 1rem;
-        font-weight: 600;
-    }}
-    .stButton > button:hover {{
-        background-color: #005c2d;
-        border-color: #005c2d;
-        color: #ffffff;
-    }}
-
-    /* sidebar background: light grey with subtle border */
-    [data-testid="stSidebar"] {{
-        background: #f5f7f6;
-        border-right: 1px solid rgba(0, 0, 0, 0.05);
-    }}
-
-    /* default text elements in green */
-    p, span, label, .stMarkdown, .stText, .stCaption {{
-        color: {PRIMARY_GREEN};
-    }}
-
-    /* headings in HSG green */
-    h1, h2, h3, h4 {{
-        color: {PRIMARY_GREEN};
-    }}
-
-    /* rounded cards (containers with border=True) */
-    div[data-testid="stVerticalBlock"] > div > div[style*="border-radius: 0.5rem"] {{
-        border-radius: 1rem !important;
-    }}
-
-    /* ---- number inputs (Age, Weight, Height) styled like pills ---- */
-    div[data-testid="stNumberInput"] input {{
-        background-color: #ffffff !important;
-        color: {PRIMARY_GREEN} !important;
-        border-radius: 999px !important;
-        border: 1px solid {PRIMARY_GREEN} !important;
-        padding: 0.25rem 0.75rem !important;
-    }}
-
-    div[data-testid="stNumberInput"] input:focus {{
-        outline: none !important;
-        border: 2px solid {PRIMARY_GREEN} !important;
-        box-shadow: 0 0 0 1px rgba(0, 122, 61, 0.25);
-        background-color: #ffffff !important;
-        color: {PRIMARY_GREEN} !important;
-    }}
-
-    div[data-testid="stNumberInput"] button {{
-        background-color: #ffffff !important;
-        color: {PRIMARY_GREEN} !important;
-        border-radius: 999px !important;
-        border: 1px solid {PRIMARY_GREEN} !important;
-    }}
+@st.cache_resource
+def sidebar_logo_html() -> str:
+    """Sidebar logo block with the base64 logo embedded once."""
+    return f"""
+    <div style="text-align: left; padding-top: 1rem; padding-bottom: 1rem;">
+        <img src="data:image/png;base64,{LOGO_IMAGE}"
+             style="width: 170px; margin-bottom: 0.5rem;">
+    </div>
+    """
 
-    div[data-testid="stNumberInput"] button:hover {{
-        background-color: {PRIMARY_GREEN} !important;
-        color: #ffffff !important;
-        border-color: {PRIMARY_GREEN} !important;
-    }}
 
-    /* ---- text & password inputs (login / register / reset) ---- */
-    div[data-testid="stTextInput"] input,
-    div[data-testid="stPasswordInput"] input {{
-        background-color: #ffffff !important;
-        color: {PRIMARY_GREEN} !important;
-        border-radius: 999px !important;
-        border: 1px solid {PRIMARY_GREEN} !important;
-        padding: 0.4rem 0.75rem !important;
-    }}
+# ---------- GLOBAL CSS (theme) ----------
+@st.cache_resource
+def load_theme_css() -> str:
+    """Read theme.css once per server process and fill in the theme colour."""
+    with open("theme.css") as f:
+        return "<style>" + f.read().replace("{PRIMARY_GREEN}", PRIMARY_GREEN) + "</style>"
 
-    div[data-testid="stTextInput"] input::placeholder,
-    div[data-testid="stPasswordInput"] input::placeholder {{
-        color: rgba(0, 122, 61, 0.6) !important;
-    }}
 
-    div[data-testid="stTextInput"] input:focus,
-    div[data-testid="stPasswordInput"] input:focus {{
-        outline: none !important;
-        border: 2px solid {PRIMARY_GREEN} !important;
-        box-shadow: 0 0 0 1px rgba(0, 122, 61, 0.25);
-        background-color: #ffffff !important;
-        color: {PRIMARY_GREEN} !important;
+@st.cache_resource
+def login_background_css() -> str:
+    """Background image style for the auth screens (the base64 image is embedded once)."""
+    return f"""
+    <style>
+    [data-testid="stAppViewContainer"] {{
+        background-image: url("data:image/jpg;base64,{BACKGROUND_IMAGE}");
+        background-size: cover;
+        background-position: center;
+        background-repeat: no-repeat;
     }}
 
-    /* code blocks – white background instead of black */
-    div[data-testid="stCodeBlock"] pre,
-    div[data-testid="stCodeBlock"] {{
-        background-color: #FFFFFF !important;
-        color: {PRIMARY_GREEN} !important;
-        border-radius: 0.75rem !important;
+    .block-container {{
+        background-color: rgba(255, 255, 255, 0.75);
+        border-radius: 1rem;
+        padding-top: 2rem;
+        padding-bottom: 2rem;
     }}
     </style>
-    """,
-    unsafe_allow_html=True,
-)
-
-# =========================================================
-# DATABASE + SECURITY
-# =========================================================
-
-def get_db():
-    """Open a connection to the SQLite database file."""
-    conn = sqlite3.connect("gym_app.db")
-    conn.execute("PRAGMA foreign_keys = 1")
-    return conn
-
-
-def create_tables():
-    """Create users and profiles tables if they don't exist, add missing columns."""
-    conn = get_db()
-    cur = conn.cursor()
-
-    # users table
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            email TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL
-        )
-    """)
-
-    # profiles table
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS profiles (
-            user_id INTEGER UNIQUE,
-            age INTEGER,
-            weight REAL,
-            height REAL,
-            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-        )
-    """)
-
-    # add missing columns if not exist
-    additional_cols = [
-        "username TEXT",
-        "allergies TEXT",
-        "training_type TEXT",
-        "diet_preferences TEXT",
-        "gender TEXT DEFAULT 'Male'",
-        "goal TEXT DEFAULT 'Maintain'"
-    ]
-    for col_def in additional_cols:
-        try:
-            cur.execute(f"ALTER TABLE profiles ADD COLUMN {col_def}")
-        except sqlite3.OperationalError:
-            pass  # column already exists
-
-    conn.commit()
-    conn.close()
-
-
-
-def hash_password(password: str) -> str:
-    """Hash a password string with SHA256."""
-    return hashlib.sha256(password.encode()).hexdigest()
-
-
-# ---------- password + email validation ----------
-
-def validate_password_strength(password: str):
-    """
-    Check if password is strong enough:
-    - at least 8 characters
-    - at least one lowercase letter
-    - at least one uppercase letter
-    - at least one digit
-    - at least one special character
     """
-    if len(password) < 8:
-        return False, "Password must be at least 8 characters long."
-    if not re.search(r"[a-z]", password):
-        return False, "Password must contain at least one lowercase letter."
-    if not re.search(r"[A-Z]", password):
-        return False, "Password must contain at least one uppercase letter."
-    if not re.search(r"[0-9]", password):
-        return False, "Password must contain at least one digit."
-    if not re.search(r"[^A-Za-z0-9]", password):
-        return False, (
-            "Password must contain at least one special character "
-            "(e.g. !, ?, #, ...)."
-        )
-    return True, ""
-
 
-def is_valid_email(email: str) -> bool:
-    """Simple email format validation."""
-    pattern = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
-    return re.match(pattern, email) is not None
 
+# logged-in pages: drop the login background again
+PLAIN_BACKGROUND_CSS = """
+<style>
+[data-testid="stAppViewContainer"] {
+    background-image: none !important;
+    background-color: #ffffff !important;
+}
+</style>
+"""
 
-# =========================================================
-# AUTHENTICATION LOGIC
-# =========================================================
-
-def register_user(email: str, password: str):
-    """Create a new user and an empty profile. Return (ok, msg, user_id)."""
-    conn = get_db()
-    cur = conn.cursor()
-
-    try:
-        cur.execute(
-            "INSERT INTO users (email, password_hash) VALUES (?, ?)",
-            (email, hash_password(password)),
-        )
-        user_id = cur.lastrowid
-
-        # create empty profile row for the new user
-        cur.execute(
-            """
-            INSERT INTO profiles (
-                user_id, age, weight, height,
-                username, allergies, training_type, diet_preferences
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (user_id, None, None, None, None, None, None, None),
-        )
-
-        conn.commit()
-        conn.close()
-        return True, "Account created.", user_id
-    except sqlite3.IntegrityError:
-        conn.close()
-        return False, "An account with this email already exists.", None
-
-
-def verify_user(email: str, password: str):
-    """Return user_id if email/password are correct, otherwise None."""
-    conn = get_db()
-    cur = conn.cursor()
-
-    cur.execute(
-        "SELECT id, password_hash FROM users WHERE email = ?",
-        (email,),
-    )
-    row = cur.fetchone()
-    conn.close()
-
-    if row is None:
-        return None
-
-    user_id, stored_hash = row
-    if stored_hash == hash_password(password):
-        return user_id
-    return None
-
-
-def reset_password(email: str, new_password: str):
-    """Reset password for a given email (demo version: no email verification)."""
-    conn = get_db()
-    cur = conn.cursor()
-
-    cur.execute("SELECT id FROM users WHERE email = ?", (email,))
-    row = cur.fetchone()
-    if row is None:
-        conn.close()
-        return False, "No account found with this email."
-
-    cur.execute(
-        "UPDATE users SET password_hash = ? WHERE email = ?",
-        (hash_password(new_password), email),
-    )
-    conn.commit()
-    conn.close()
-    return True, "Password updated successfully."
 
+# injected on every run: Streamlit drops elements a rerun does not emit again,
+# so only the string is cached; st.html skips the markdown parser
+@st.cache_resource
+def page_css(logged_in: bool) -> str:
+    """Theme CSS plus the background for the current screen, sent as one element."""
+    background = PLAIN_BACKGROUND_CSS if logged_in else login_background_css()
+    return load_theme_css() + background
 
 # =========================================================
 # PROFILE DB ACCESS
 # =========================================================
 
-def get_profile(user_id: int):
-    """Fetch profile info for a given user_id."""
-    conn = get_db()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        SELECT age, weight, height,
-               username, allergies, training_type, diet_preferences
-        FROM profiles WHERE user_id = ?
-        """,
-        (user_id,),
-    )
-    row = cur.fetchone()
-    conn.close()
-
-    if row:
-        return {
-            "age": row[0],
-            "weight": row[1],
-            "height": row[2],
-            "username": row[3],
-            "allergies": row[4],
-            "training_type": row[5],
-            "diet_preferences": row[6],
-        }
-
-    return {
-        "age": None,
-        "weight": None,
-        "height": None,
-        "username": None,
-        "allergies": None,
-        "training_type": None,
-        "diet_preferences": None,
-    }
-
-
-def update_profile(
-    user_id: int,
-    age: int,
-    weight: float,
-    height: float,
-    username: str,
-    allergies: str,
-    training_type: str,
-    diet_preferences: str,
-):
-    """Update profile values for a given user_id."""
-    conn = get_db()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        UPDATE profiles
-        SET age = ?, weight = ?, height = ?,
-            username = ?, allergies = ?,
-            training_type = ?, diet_preferences = ?
-        WHERE user_id = ?
-        """,
-        (
-            age,
-            weight,
-            height,
-            username,
-            allergies,
-            training_type,
-            diet_preferences,
-            user_id,
-        ),
-    )
-    conn.commit()
-    conn.close()
+def current_profile():
+    """Profile of the logged-in user, kept in st.session_state and written through on save."""
+    return database_current_profile(st.session_state.user_id)
 
 
 # =========================================================
 # AUTHENTICATION UI (LOGIN / REGISTER / RESET)
 # =========================================================
 
+def set_login_mode(mode: str):
+    """Button callback: callbacks run before the next script run, so no extra st.rerun() is needed."""
+    st.session_state.login_mode = mode
+
+
 def show_login_page():
     """Login screen styled with centered card."""
-    col_left, col_center, col_right = st.columns([1, 2, 1])
-
-    with col_center:
+    with st.container(key="auth_center"):  # centred by theme.css
         st.title("Login")
         st.caption("Log in to your UniFit Coach dashboard.")
 
         with st.container(border=True):
-            email = st.text_input("Email")
-            password = st.text_input("Password", type="password")
+            email = st.text_input("Email", key="login_email")
+            password = st.text_input("Password", type="password", key="login_password")
 
             if st.button("Login", use_container_width=True):
                 if not email or not password:
@@ -453,6 +150,7 @@ def show_login_page():
                         st.session_state.logged_in = True
                         st.session_state.user_id = user_id
                         st.session_state.user_email = email
+                        st.session_state.profile = get_profile(user_id)
                         st.session_state.current_page = "Profile"
                         st.rerun()
                     else:
@@ -460,39 +158,40 @@ def show_login_page():
 
         st.write("---")
         st.write("Don't have an account yet?")
-        if st.button("Create a new account", use_container_width=True):
-            st.session_state.login_mode = "register"
-            st.rerun()
+        st.button("Create a new account", use_container_width=True,
+                  on_click=set_login_mode, args=("register",))
 
         st.write("")
-        if st.button("Forgot password?", use_container_width=True):
-            st.session_state.login_mode = "reset"
-            st.rerun()
+        st.button("Forgot password?", use_container_width=True,
+                  on_click=set_login_mode, args=("reset",))
+
+
+# static rules list, written as HTML so no markdown is parsed on each keystroke rerun
+PASSWORD_RULES_HTML = """
+<div class="pw-rules">
+<p><strong>Password must contain:</strong></p>
+<ul>
+    <li>at least 8 characters</li>
+    <li>at least one lowercase letter</li>
+    <li>at least one uppercase letter</li>
+    <li>at least one digit</li>
+    <li>at least one special character (e.g. <code>!</code>, <code>?</code>, <code>#</code>, <code>@</code>)</li>
+</ul>
+</div>
+"""
 
 
 def show_register_page():
     """Registration screen styled with centered card and password rules."""
-    col_left, col_center, col_right = st.columns([1, 2, 1])
-
-    with col_center:
+    with st.container(key="auth_center"):  # centred by theme.css
         st.title("Register")
         st.caption("Create an account for UniFit Coach.")
 
         with st.container(border=True):
-            email = st.text_input("Email")
-            password = st.text_input("Password", type="password")
-
-            st.markdown(
-                """
-                **Password must contain:**
-                - at least 8 characters  
-                - at least one lowercase letter  
-                - at least one uppercase letter  
-                - at least one digit  
-                - at least one special character (e.g. `!`, `?`, `#`, `@`)
-                """,
-                unsafe_allow_html=False,
-            )
+            email = st.text_input("Email", key="register_email")
+            password = st.text_input("Password", type="password", key="register_password")
+
+            st.html(PASSWORD_RULES_HTML)
 
             if st.button("Register", use_container_width=True):
                 if not email or not password:
@@ -509,6 +208,7 @@ def show_register_page():
                             st.session_state.logged_in = True
                             st.session_state.user_id = user_id
                             st.session_state.user_email = email
+                            st.session_state.profile = get_profile(user_id)
                             st.session_state.current_page = "Profile"
                             st.success("Account created! Let's set up your profile.")
                             st.rerun()
@@ -516,28 +216,26 @@ def show_register_page():
                             st.error(msg)
 
         st.write("---")
-        if st.button("Back to login", use_container_width=True):
-            st.session_state.login_mode = "login"
-            st.rerun()
+        st.button("Back to login", use_container_width=True,
+                  key="back_to_login_register", on_click=set_login_mode, args=("login",))
 
 
 def show_reset_password_page():
     """Simple password reset: enter email + new password (demo, no email verification)."""
-    col_left, col_center, col_right = st.columns([1, 2, 1])
-
-    with col_center:
+    with st.container(key="auth_center"):  # centred by theme.css
         st.title("Reset password")
         st.caption(
             "For demo purposes, you can reset your password by entering your email "
             "and a new password."
         )
 
-        with st.container(border=True):
-            email = st.text_input("Email")
-            new_pw = st.text_input("New password", type="password")
-            confirm_pw = st.text_input("Confirm new password", type="password")
+        # a form: typing in the fields doesn't rerun the script, only the submit does
+        with st.form("reset_form", border=True):
+            email = st.text_input("Email", key="reset_email")
+            new_pw = st.text_input("New password", type="password", key="reset_new_password")
+            confirm_pw = st.text_input("Confirm new password", type="password", key="reset_confirm_password")
 
-            if st.button("Reset password", use_container_width=True):
+            if st.form_submit_button("Reset password", use_container_width=True):
                 if not email or not new_pw or not confirm_pw:
                     st.error("Please fill out all fields.")
                 elif new_pw != confirm_pw:
@@ -558,245 +256,127 @@ def show_reset_password_page():
                             st.error(msg)
 
         st.write("---")
-        if st.button("Back to login", use_container_width=True):
-            st.session_state.login_mode = "login"
-            st.rerun()
+        st.button("Back to login", use_container_width=True,
+                  key="back_to_login_reset", on_click=set_login_mode, args=("login",))
 
 
-# =========================================================
-# PUMPFESSOR JOE – SIMPLE IN-APP GUIDE
-# =========================================================
+AUTH_PAGES = {
+    "login": show_login_page,
+    "register": show_register_page,
+    "reset": show_reset_password_page,
+}
 
-def show_pumpfessor_joe(page_name: str):
-    """Small helper box with tips depending on the current page."""
-    with st.expander("👨‍🏫 Pumpfessor Joe – Need a quick guide?", expanded=False):
-        if page_name == "Profile":
-            st.write(
-                "Welcome to your **Profile**! 🧍‍♂️\n\n"
-                "- Enter your age, weight, height, preferences and allergies.\n"
-                "- Click **Save profile**.\n"
-                "- This data can be used to personalize your workouts "
-                "and nutrition advice."
-            )
-        elif page_name == "Trainer":
-            st.write(
-                "This is the **Trainer** page. 🏋️‍♂️\n\n"
-                "Use the tabs to build a workout with Pumpfessor Joe and "
-                "see your long-term training schedule."
-            )
-        elif page_name == "Calorie tracker":
-            st.write(
-                "On the **Calorie tracker** page 🔥 you can:\n"
-                "- Enter your body data and training session.\n"
-                "- Let Pumpfessor Joe estimate your daily calorie target.\n"
-                "- Log your meals and track calories & protein with donut charts."
-            )
-        elif page_name == "Nutrition adviser":
-            st.write(
-                "The **Nutrition adviser** page 🥗 will later give you suggestions on "
-                "meals or macros based on your goals and allergies."
-            )
-        elif page_name == "Progress":
-            st.write(
-                "The **Progress** page 📈 shows how you're doing over time.\n\n"
-                "Right now you see a demo chart. In the future, this can be replaced "
-                "with real workout or calorie data."
-            )
-        else:
-            st.write(
-                "Pumpfessor Joe is here to help you navigate UniFit Coach. "
-                "Use the menu on the left to switch between pages."
-            )
 
+def auth_router():
+    """Render the auth screen for the current login_mode into a single placeholder."""
+    with st.empty().container():
+        AUTH_PAGES[st.session_state.login_mode]()
 
-# =========================================================
-# APP PAGES
-# =========================================================
 
 # =========================================================
-# PROFILE DB ACCESS (updated copy is below too)
+# PUMPFESSOR JOE – SIMPLE IN-APP GUIDE
 # =========================================================
 
-def get_profile(user_id: int):
-    """Fetch profile info for a given user_id."""
-    conn = get_db()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        SELECT age, weight, height,
-               username, allergies, training_type, diet_preferences
-        FROM profiles WHERE user_id = ?
-        """,
-        (user_id,),
-    )
-    row = cur.fetchone()
-    conn.close()
-
-    if row:
-        return {
-            "age": row[0],
-            "weight": row[1],
-            "height": row[2],
-            "username": row[3],
-            "allergies": row[4],
-            "training_type": row[5],
-            "diet_preferences": row[6],
-        }
-
-    return {
-        "age": None,
-        "weight": None,
-        "height": None,
-        "username": None,
-        "allergies": None,
-        "training_type": None,
-        "diet_preferences": None,
-    }
+JOE_TIPS = {
+    "Profile": (
+        "Welcome to your **Profile**! 🧍‍♂️\n\n"
+        "- Enter your age, weight, height, preferences and allergies.\n"
+        "- Click **Save profile**.\n"
+        "- This data can be used to personalize your workouts "
+        "and nutrition advice."
+    ),
+    "Trainer": (
+        "This is the **Trainer** page. 🏋️‍♂️\n\n"
+        "Use the tabs to build a workout with Pumpfessor Joe and "
+        "see your long-term training schedule."
+    ),
+    "Calorie tracker": (
+        "On the **Calorie tracker** page 🔥 you can:\n"
+        "- Enter your body data and training session.\n"
+        "- Let Pumpfessor Joe estimate your daily calorie target.\n"
+        "- Log your meals and track calories & protein with donut charts."
+    ),
+    "Nutrition adviser": (
+        "The **Nutrition adviser** page 🥗 will later give you suggestions on "
+        "meals or macros based on your goals and allergies."
+    ),
+    "Progress": (
+        "The **Progress** page 📈 shows how you're doing over time.\n\n"
+        "Right now you see a demo chart. In the future, this can be replaced "
+        "with real workout or calorie data."
+    ),
+}
+JOE_DEFAULT_TIP = (
+    "Pumpfessor Joe is here to help you navigate UniFit Coach. "
+    "Use the menu on the left to switch between pages."
+)
 
 
-def update_profile(
-    user_id: int,
-    age: int,
-    weight: float,
-    height: float,
-    username: str,
-    allergies: str,
-    training_type: str,
-    diet_preferences: str,
-):
-    """Update profile values for a given user_id."""
-    conn = get_db()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        UPDATE profiles
-        SET age = ?, weight = ?, height = ?,
-            username = ?, allergies = ?,
-            training_type = ?, diet_preferences = ?
-        WHERE user_id = ?
-        """,
-        (
-            age,
-            weight,
-            height,
-            username,
-            allergies,
-            training_type,
-            diet_preferences,
-            user_id,
-        ),
+def show_pumpfessor_joe(page_name: str):
+    """Small helper box with tips depending on the current page."""
+    # on_change="rerun" makes the expander track its state, so the tip is only sent while it is open
+    joe = st.expander(
+        "👨‍🏫 Pumpfessor Joe – Need a quick guide?",
+        expanded=False,
+        key="joe_expander",
+        on_change="rerun",
     )
-    conn.commit()
-    conn.close()
+    if joe.open:
+        with joe:
+            st.markdown(JOE_TIPS.get(page_name, JOE_DEFAULT_TIP))
 
 
 # =========================================================
-# PROFILE DB ACCESS (updated with gender + goal) - KEEP this one too
+# APP PAGES
 # =========================================================
 
-def get_profile(user_id: int):
-    """Fetch profile info for a given user_id."""
-    conn = get_db()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        SELECT age, weight, height,
-               username, allergies, training_type, diet_preferences,
-               gender, goal
-        FROM profiles WHERE user_id = ?
-        """,
-        (user_id,),
-    )
-    row = cur.fetchone()
-    conn.close()
-
-    if row:
-        return {
-            "age": row[0],
-            "weight": row[1],
-            "height": row[2],
-            "username": row[3],
-            "allergies": row[4],
-            "training_type": row[5],
-            "diet_preferences": row[6],
-            "gender": row[7] or "Male",
-            "goal": row[8] or "Maintain",
-        }
-
-    return {
-        "age": None,
-        "weight": None,
-        "height": None,
-        "username": None,
-        "allergies": None,
-        "training_type": None,
-        "diet_preferences": None,
-        "gender": "Male",
-        "goal": "Maintain",
-    }
+# title + caption shown above every screen
+APP_HEADER = "# UniFit Coach\n\n:small[Train smarter. Eat better. Stay consistent. 🌿]"
 
 
-def update_profile(
-    user_id: int,
-    age: int,
-    weight: float,
-    height: float,
-    username: str,
-    allergies: str,
-    training_type: str,
-    diet_preferences: str,
-    gender: str,
-    goal: str,
-):
-    """Update profile values for a given user_id."""
-    conn = get_db()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        UPDATE profiles
-        SET age = ?, weight = ?, height = ?,
-            username = ?, allergies = ?,
-            training_type = ?, diet_preferences = ?,
-            gender = ?, goal = ?
-        WHERE user_id = ?
-        """,
-        (
-            age,
-            weight,
-            height,
-            username,
-            allergies,
-            training_type,
-            diet_preferences,
-            gender,
-            goal,
-            user_id,
-        ),
-    )
-    conn.commit()
-    conn.close()
+def page_header(title: str, intro: str = ""):
+    """Page heading, optional intro line and divider, sent as one markdown element."""
+    if intro:
+        st.markdown(f"## {title}\n\n{intro}\n\n---")
+    else:
+        st.markdown(f"## {title}\n\n---")
 
 
 # =========================================================
 # PROFILE PAGE (updated)
 # =========================================================
 
+# selectbox options; unknown or empty stored values fall back to the default entry
+TRAINING_OPTIONS = ["Not set", "Strength", "Hypertrophy", "Endurance", "Mixed"]
+DIET_OPTIONS = [
+    "Not set",
+    "No preference",
+    "High protein",
+    "Vegetarian",
+    "Vegan",
+    "Low carb",
+    "Mediterranean",
+]
+GOAL_OPTIONS = ["Cut", "Maintain", "Bulk"]
+TRAINING_INDEX = {v: i for i, v in enumerate(TRAINING_OPTIONS)}
+DIET_INDEX = {v: i for i, v in enumerate(DIET_OPTIONS)}
+GOAL_INDEX = {v: i for i, v in enumerate(GOAL_OPTIONS)}
+
+# values that count as "not filled in" for the completeness bar
+UNSET_PROFILE_VALUES = frozenset([None, 0, "", "Not set"])  # 0 == 0.0, so floats are covered
+
+
 def show_profile_page():
     """Profile page with inputs stored in the database, including Gender + Goal."""
     user_id = st.session_state.user_id
-    profile = get_profile(user_id)
+    profile = current_profile()
 
-    st.header("Profile")
-    st.write("Basic information that can be used by the trainer and nutrition logic later.")
-    st.divider()
+    page_header("Profile", "Basic information that can be used by the trainer and nutrition logic later.")
 
     # Use a full-width container for the profile form so it can expand
     with st.container():
-        with st.container(border=True):
+        # edits are sent in one rerun on "Save profile" instead of one per widget change
+        with st.form("profile_form", border=True):
             st.subheader("Your data")
 
             # keep two-column layout for form fields inside the full width container
@@ -807,7 +387,7 @@ def show_profile_page():
                     "Age (years)",
                     min_value=0,
                     max_value=120,
-                    value=profile["age"] if profile["age"] is not None else 0,
+                    value=profile["age"] or 0,
                     step=1,
                 )
 
@@ -815,7 +395,7 @@ def show_profile_page():
                     "Height (cm)",
                     min_value=0.0,
                     max_value=300.0,
-                    value=profile["height"] if profile["height"] is not None else 0.0,
+                    value=profile["height"] or 0.0,
                     step=0.5,
                 )
 
@@ -836,52 +416,26 @@ def show_profile_page():
                     "Weight (kg)",
                     min_value=0.0,
                     max_value=500.0,
-                    value=profile["weight"] if profile["weight"] is not None else 0.0,
+                    value=profile["weight"] or 0.0,
                     step=0.5,
                 )
 
-                training_options = [
-                    "Not set",
-                    "Strength",
-                    "Hypertrophy",
-                    "Endurance",
-                    "Mixed",
-                ]
-                current_training = profile["training_type"] or "Not set"
-                if current_training not in training_options:
-                    current_training = "Not set"
                 training_type = st.selectbox(
                     "Preferred training style",
-                    training_options,
-                    index=training_options.index(current_training),
+                    TRAINING_OPTIONS,
+                    index=TRAINING_INDEX.get(profile["training_type"], 0),
                 )
 
-                diet_options = [
-                    "Not set",
-                    "No preference",
-                    "High protein",
-                    "Vegetarian",
-                    "Vegan",
-                    "Low carb",
-                    "Mediterranean",
-                ]
-                current_diet = profile["diet_preferences"] or "Not set"
-                if current_diet not in diet_options:
-                    current_diet = "Not set"
                 diet_preferences = st.selectbox(
                     "Diet preference",
-                    diet_options,
-                    index=diet_options.index(current_diet),
+                    DIET_OPTIONS,
+                    index=DIET_INDEX.get(profile["diet_preferences"], 0),
                 )
 
-                goal_options = ["Cut", "Maintain", "Bulk"]
-                current_goal = profile["goal"] or "Maintain"
-                if current_goal not in goal_options:
-                    current_goal = "Maintain"
                 goal = st.selectbox(
                     "Goal",
-                    goal_options,
-                    index=goal_options.index(current_goal),
+                    GOAL_OPTIONS,
+                    index=GOAL_INDEX.get(profile["goal"], GOAL_INDEX["Maintain"]),
                 )
 
             allergies = st.text_area(
@@ -890,8 +444,8 @@ def show_profile_page():
                 help="For example: peanuts, lactose, gluten …",
             )
 
-            if st.button("Save profile", use_container_width=True):
-                update_profile(
+            if st.form_submit_button("Save profile", use_container_width=True):
+                profile = st.session_state.profile = update_profile(
                     user_id,
                     int(age),
                     float(weight),
@@ -908,18 +462,18 @@ def show_profile_page():
     st.divider()
     st.subheader("Current profile data")
 
-    # reload profile from DB (in case it changed)
-    profile = get_profile(user_id)
-
-    st.write(f"**Username:** {profile['username'] or 'Not set'}")
-    st.write(f"**Age:** {profile['age'] or 'Not set'} years")
-    st.write(f"**Weight:** {profile['weight'] or 'Not set'} kg")
-    st.write(f"**Height:** {profile['height'] or 'Not set'} cm")
-    st.write(f"**Gender:** {profile['gender']}")
-    st.write(f"**Goal:** {profile['goal']}")
-    st.write(f"**Training style:** {profile['training_type'] or 'Not set'}")
-    st.write(f"**Diet preference:** {profile['diet_preferences'] or 'Not set'}")
-    st.write(f"**Allergies:** {profile['allergies'] or 'None noted'}")
+    # one markdown element instead of nine separate st.write calls
+    st.markdown("\n\n".join([
+        "**Username:** %s" % (profile["username"] or "Not set"),
+        "**Age:** %s years" % (profile["age"] or "Not set"),
+        "**Weight:** %s kg" % (profile["weight"] or "Not set"),
+        "**Height:** %s cm" % (profile["height"] or "Not set"),
+        "**Gender:** %s" % profile["gender"],
+        "**Goal:** %s" % profile["goal"],
+        "**Training style:** %s" % (profile["training_type"] or "Not set"),
+        "**Diet preference:** %s" % (profile["diet_preferences"] or "Not set"),
+        "**Allergies:** %s" % (profile["allergies"] or "None noted"),
+    ]))
 
     # --- Profile completeness indicator ---
     fields_for_completeness = [
@@ -932,10 +486,8 @@ def show_profile_page():
         profile["gender"],
         profile["goal"],
     ]
-    filled_fields = sum(
-        1
-        for v in fields_for_completeness
-        if v not in (None, 0, 0.0, "", "Not set")
+    filled_fields = len(fields_for_completeness) - sum(
+        v in UNSET_PROFILE_VALUES for v in fields_for_completeness
     )
     completeness = filled_fields / len(fields_for_completeness)
     st.write("")
@@ -946,9 +498,10 @@ def show_profile_page():
 
 def show_trainer_page():
     """Trainer page: integrates Pumpfessor Joe workout builder + calendar."""
-    st.header("Trainer")
-    st.write("Build your personalized workout and see your training calendar with Pumpfessor Joe 🧠💪")
-    st.divider()
+    page_header("Trainer", "Build your personalized workout and see your training calendar with Pumpfessor Joe 🧠💪")
+
+    import workout_planner  # teammates' workout builder
+    import workout_calendar  # teammates' calendar
 
     # Use full-width container so embedded modules can expand across the page
     with st.container():
@@ -964,8 +517,9 @@ def show_trainer_page():
 
 def show_calorie_tracker_page():
     """Calorie tracker page: integrates ML-based nutrition planner."""
-    st.header("Calorie tracker")
-    st.divider()
+    import calorie_tracker  # ML-based calorie & protein tracker
+
+    page_header("Calorie tracker")
 
     with st.container():
         with st.container(border=True):
@@ -973,8 +527,9 @@ def show_calorie_tracker_page():
 
 def show_calories_nutrition_page():
     """Calorie tracker page: integrates ML-based nutrition planner."""
-    st.header("Calorie tracker")
-    st.divider()
+    import calories_nutrition
+
+    page_header("Calorie tracker")
 
     with st.container():
         with st.container(border=True):
@@ -983,18 +538,30 @@ def show_calories_nutrition_page():
 
 def show_nutrition_page():
     """Nutrition adviser page: load logic from nutrition_advisory.py"""
-    st.header("Nutrition adviser")
-    st.divider()
+    import nutrition_advisory
+
+    page_header("Nutrition adviser")
 
     with st.container():
         with st.container(border=True):
             # ruft das externe Modul auf
             nutrition_advisory.main()
 
+@st.cache_resource
+def demo_progress_data():
+    """Constant demo frame for the Progress chart, built once per process."""
+    import pandas as pd  # only the Progress page needs pandas here
+
+    data = {
+        "Week": ["Week 1", "Week 2", "Week 3", "Week 4"],
+        "Workouts": [2, 3, 4, 3],
+    }
+    return pd.DataFrame(data).set_index("Week")
+
+
 def show_progress_page():
     """Simple placeholder progress page with a demo chart."""
-    st.header("Progress")
-    st.divider()
+    page_header("Progress")
 
     with st.container():
         with st.container(border=True):
@@ -1005,13 +572,7 @@ def show_progress_page():
                 "Later, your team can replace it with real workout or calorie data."
             )
 
-            data = {
-                "Week": ["Week 1", "Week 2", "Week 3", "Week 4"],
-                "Workouts": [2, 3, 4, 3],
-            }
-            df = pd.DataFrame(data).set_index("Week")
-
-            st.bar_chart(df)
+            st.bar_chart(demo_progress_data())
 
             st.info("Your teammates can plug real data into this chart later.")
 
@@ -1020,6 +581,26 @@ def show_progress_page():
 # MAIN APP
 # =========================================================
 
+# sidebar order = dict order; new pages go here and in NAV_LABELS
+PAGES = {
+    "Profile": show_profile_page,
+    "Trainer": show_trainer_page,
+    "Calorie tracker": show_calorie_tracker_page,
+    "Calories & Nutrition": show_calories_nutrition_page,
+    "Nutrition adviser": show_nutrition_page,
+    "Progress": show_progress_page,
+}
+
+NAV_LABELS = {
+    "Profile": "👤  Profile",
+    "Trainer": "🏋️‍♂️  Trainer",
+    "Calorie tracker": "🔥  Calorie tracker",
+    "Calories & Nutrition": "🥘  Calories & Nutrition",
+    "Nutrition adviser": "🥗  Nutrition adviser",
+    "Progress": "📈  Progress",
+}
+
+
 def main():
     """Entry point: handle login state and page routing."""
     create_tables()  # make sure DB tables exist
@@ -1031,67 +612,19 @@ def main():
     if "current_page" not in st.session_state:
         st.session_state.current_page = "Profile"
 
+    # theme + background image on login / register / reset, plain white once logged in
+    st.html(page_css(st.session_state.logged_in))
+
     # if not logged in, show auth pages only (with background image)
     if not st.session_state.logged_in:
-        # background image on login / register / reset page
-        st.markdown(
-            f"""
-            <style>
-            [data-testid="stAppViewContainer"] {{
-                background-image: url("data:image/jpg;base64,{BACKGROUND_IMAGE}");
-                background-size: cover;
-                background-position: center;
-                background-repeat: no-repeat;
-            }}
-
-            .block-container {{
-                background-color: rgba(255, 255, 255, 0.75);
-                border-radius: 1rem;
-                padding-top: 2rem;
-                padding-bottom: 2rem;
-            }}
-            </style>
-            """,
-            unsafe_allow_html=True,
-        )
+        st.markdown(APP_HEADER + "\n\n---")
 
-        st.title("UniFit Coach")
-        st.caption("Train smarter. Eat better. Stay consistent. 🌿")
-        st.divider()
-
-        mode = st.session_state.login_mode
-        if mode == "login":
-            show_login_page()
-        elif mode == "register":
-            show_register_page()
-        elif mode == "reset":
-            show_reset_password_page()
+        auth_router()
         return
 
-    # when logged in: remove background image -> plain white
-    st.markdown(
-        """
-        <style>
-        [data-testid="stAppViewContainer"] {
-            background-image: none !important;
-            background-color: #ffffff !important;
-        }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
-
     # --------------- SIDEBAR (logo + navigation) ---------------
     if LOGO_IMAGE:
-        st.sidebar.markdown(
-            f"""
-            <div style="text-align: left; padding-top: 1rem; padding-bottom: 1rem;">
-                <img src="data:image/png;base64,{LOGO_IMAGE}"
-                     style="width: 170px; margin-bottom: 0.5rem;">
-            </div>
-            """,
-            unsafe_allow_html=True,
-        )
+        st.sidebar.html(sidebar_logo_html())
     else:
         st.sidebar.markdown("### UniFit Coach")
 
@@ -1102,33 +635,29 @@ def main():
         st.sidebar.caption(f"Logged in as: {st.session_state.user_email}")
         st.sidebar.write("---")
 
-    if st.sidebar.button("👤  Profile"):
-        st.session_state.current_page = "Profile"
-    if st.sidebar.button("🏋️‍♂️  Trainer"):
-        st.session_state.current_page = "Trainer"
-    if st.sidebar.button("🔥  Calorie tracker"):
-        st.session_state.current_page = "Calorie tracker"
-    if st.sidebar.button("🥘  Calories & Nutrition"):
-        st.session_state.current_page = "Calories & Nutrition"
-    if st.sidebar.button("🥗  Nutrition adviser"):
-        st.session_state.current_page = "Nutrition adviser"
-    if st.sidebar.button("📈  Progress"):
-        st.session_state.current_page = "Progress"
+    # one radio bound to current_page instead of a button per page
+    st.sidebar.radio(
+        "Menu",
+        list(PAGES),
+        key="current_page",
+        format_func=NAV_LABELS.get,
+        label_visibility="collapsed",
+    )
 
     st.sidebar.write("---")
     if st.sidebar.button("Log out"):
         st.session_state.logged_in = False
         st.session_state.user_id = None
         st.session_state.user_email = None
+        st.session_state.profile = None
         st.session_state.login_mode = "login"
         st.rerun()
 
     # --------------- MAIN LAYOUT (same structure for all pages) ---------------
-    st.title("UniFit Coach")
-    st.caption("Train smarter. Eat better. Stay consistent. 🌿")
+    header = APP_HEADER
     if "user_email" in st.session_state and st.session_state.user_email:
-        st.write(f"Welcome back, **{st.session_state.user_email}** 👋")
-    st.divider()
+        header += f"\n\nWelcome back, **{st.session_state.user_email}** 👋"
+    st.markdown(header + "\n\n---")
 
     page = st.session_state.current_page
 
@@ -1136,60 +665,7 @@ def main():
     show_pumpfessor_joe(page)
 
     # Seiten anzeigen
-    if page == "Profile":
-        show_profile_page()
-    elif page == "Trainer":
-        show_trainer_page()
-    elif page == "Calorie tracker":
-        show_calorie_tracker_page()
-    elif page == "Nutrition adviser":
-        show_nutrition_page()
-    elif page == "Progress":
-        show_progress_page()
-    # <<< Hier die neue Seite einfügen >>>
-    elif page == "Calories & Nutrition":
-        show_calories_nutrition_page()
-
-
-
-# ---- FINAL CSS OVERRIDES (ensure buttons + sidebar look correct) ----
-st.markdown(
-    f"""
-    <style>
-    /* All action buttons (Login, Save profile, etc.) -> white text */
-    div.stButton > button,
-    div.stButton > button * {{
-        color: #ffffff !important;
-        font-weight: 600 !important;
-    }}
-
-    /* Sidebar buttons: white by default, green text + border */
-    section[data-testid="stSidebar"] div.stButton > button {{
-        width: 100% !important;
-        background-color: #ffffff !important;
-        color: {PRIMARY_GREEN} !important;
-        border: 1px solid {PRIMARY_GREEN} !important;
-    }}
-    section[data-testid="stSidebar"] div.stButton > button * {{
-        color: {PRIMARY_GREEN} !important;
-    }}
-
-    /* Sidebar buttons on hover/press: green background, white text */
-    section[data-testid="stSidebar"] div.stButton > button:hover,
-    section[data-testid="stSidebar"] div.stButton > button:active,
-    section[data-testid="stSidebar"] div.stButton > button:focus {{
-        background-color: {PRIMARY_GREEN} !important;
-        color: #ffffff !important;
-    }}
-    section[data-testid="stSidebar"] div.stButton > button:hover *,
-    section[data-testid="stSidebar"] div.stButton > button:active *,
-    section[data-testid="stSidebar"] div.stButton > button:focus * {{
-        color: #ffffff !important;
-    }}
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
+    PAGES[page]()
 
 
 if __name__ == "__main__":
@@ -3,43 +3,70 @@ import json
 import numpy as np
 import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
 
 from sklearn.linear_model import LinearRegression
 from sklearn.model_selection import train_test_split
-from database import get_profile
+from database import current_profile
 
 PRIMARY_COLOR = "#007A3D"
 CSV_URL = "https://raw.githubusercontent.com/philippdmt/Protein_and_Calories/refs/heads/main/calories.csv"
 
 
 def determine_training_type(heart_rate, age):
-    if heart_rate >= 0.6 * (220 - age):
-        return "Cardio"
-    else:
-        return "Kraft"
+    # works element-wise on whole columns, so no row-by-row apply is needed
+    return np.where(heart_rate >= 0.6 * (220 - age), "Cardio", "Kraft")
 
 
 @st.cache_data
-def load_and_train_model():
+def load_calories_csv():
     try:
-        calories = pd.read_csv("calories.csv")
+        return pd.read_csv("calories.csv")
     except FileNotFoundError:
-        calories = pd.read_csv(CSV_URL)
+        return pd.read_csv(CSV_URL)
+
+
+@st.cache_data
+def load_training_data():
+    calories = load_calories_csv()
 
-    calories["Training_Type"] = calories.apply(
-        lambda row: determine_training_type(row["Heart_Rate"], row["Age"]), axis=1
-    )
+    calories["Training_Type"] = determine_training_type(calories["Heart_Rate"], calories["Age"])
 
     y = calories["Calories"]
     features = calories.drop(columns=["User_ID", "Heart_Rate", "Body_Temp", "Calories"])
     X = pd.get_dummies(features, columns=["Gender", "Training_Type"], drop_first=False)
+    # plain float32 arrays: half the memory of the float64 frame, and coef_ comes out float32 too
+    return X.to_numpy(dtype=np.float32), y.to_numpy(dtype=np.float32), X.columns.tolist()
+
+
+# cache_resource: the fitted model is shared as-is instead of being pickled on every hit
+@st.cache_resource
+def load_and_train_model():
+    X, y, feature_columns = load_training_data()
 
     X_train, X_test, y_train, y_test = train_test_split(X, y, random_state=42)
     model = LinearRegression()
     model.fit(X_train, y_train)
 
-    return model, X.columns.tolist()
+    return model, feature_columns
+
+
+# the model is a plain linear regression, so a prediction is just intercept + coef . x;
+# this skips building and validating a one-row DataFrame on every rerun
+@st.cache_resource
+def model_coefficients():
+    model, feature_columns = load_and_train_model()
+    col_idx = {name: i for i, name in enumerate(feature_columns)}
+    return model.coef_, float(model.intercept_), col_idx
+
+
+def predict_training_kcal(person):
+    coef, intercept, col_idx = model_coefficients()
+    x = np.zeros(len(coef), dtype=coef.dtype)
+    for name, value in person.items():
+        i = col_idx.get(name)
+        if i is not None:  # same as reindex(columns=..., fill_value=0)
+            x[i] = value
+    return float(x @ coef + intercept)
 
 
 def grundumsatz(age, weight, height, gender):
@@ -49,26 +76,28 @@ def grundumsatz(age, weight, height, gender):
         return 10 * weight + 6.25 * height - 5 * age - 161
 
 
+def donut_svg(consumed, total, title, unit):
+    # ring drawn as two stroked circles; the dash length is the filled share, starting at 12 o'clock
+    radius = 41.25  # ring = outer 50 minus width 17.5, measured to the stroke centre
+    circumference = 2 * math.pi * radius
+    filled = circumference * min(consumed / total, 1.0)
+    color = "#007A3D" if consumed <= total else "#FF0000"
+    return f"""<svg viewBox="0 0 120 135" width="100%" xmlns="http://www.w3.org/2000/svg">
+<text x="60" y="12" text-anchor="middle" font-size="9">{title}</text>
+<circle cx="60" cy="77" r="{radius}" fill="none" stroke="#E0E0E0" stroke-width="17.5"/>
+<circle cx="60" cy="77" r="{radius}" fill="none" stroke="{color}" stroke-width="17.5"
+ stroke-dasharray="{filled:.2f} {circumference:.2f}" transform="rotate(-90 60 77)"/>
+<text x="60" y="77" text-anchor="middle" dominant-baseline="central" font-size="7">{int(consumed)} / {int(total)} {unit}</text>
+</svg>"""
+
+
 def donut_chart(consumed, total, title, unit):
     if total <= 0:
         total = 1
 
     consumed = max(0, consumed)
-    remaining = max(total - consumed, 0)
-    color = "#007A3D" if consumed <= total else "#FF0000"
-
-    fig, ax = plt.subplots(figsize=(3, 3), facecolor="white")
-    ax.pie(
-        [consumed, remaining],
-        startangle=90,
-        counterclock=False,
-        colors=[color, "#E0E0E0"],
-        wedgeprops={"width": 0.35, "edgecolor": "white"},
-    )
-    ax.set(aspect="equal")
-    ax.set_title(title)
-    ax.text(0, 0, f"{int(consumed)} / {int(total)} {unit}", ha="center", va="center", fontsize=10)
-    st.pyplot(fig)
+    # a static SVG string: no matplotlib figure to build and rasterise on every rerun
+    st.html(donut_svg(consumed, total, title, unit))
 
 
 def main():
@@ -79,7 +108,7 @@ def main():
     # MODEL LOAD
     # -------------------------
     try:
-        model, feature_columns = load_and_train_model()
+        model_coefficients()
     except Exception as e:
         st.error("Error while loading dataset/model.")
         st.exception(e)
@@ -93,7 +122,7 @@ def main():
         return
 
     user_id = st.session_state.user_id
-    user = get_profile(user_id)
+    user = current_profile(user_id)
     if not user:
         st.error("Could not load user profile.")
         return
@@ -128,9 +157,7 @@ def main():
             "Training_Type_Kraft": 1 if training_type_simple == "Kraft" else 0,
         }
 
-        person_df = pd.DataFrame([person])
-        person_df = person_df.reindex(columns=feature_columns, fill_value=0)
-        training_kcal = float(model.predict(person_df)[0])
+        training_kcal = predict_training_kcal(person)
 
     # -------------------------
     # CALCULATIONS
@@ -155,10 +182,15 @@ def main():
     # -------------------------
     if "meals" not in st.session_state:
         st.session_state.meals = []
+    if "meal_totals" not in st.session_state:
+        # running sums, kept up to date on add/reset instead of re-summing the log every rerun
+        st.session_state.meal_totals = (
+            sum(m["calories"] for m in st.session_state.meals),
+            sum(m["protein"] for m in st.session_state.meals),
+        )
 
     # Berechnung für Charts
-    total_cal = sum(m["calories"] for m in st.session_state.meals)
-    total_prot = sum(m["protein"] for m in st.session_state.meals)
+    total_cal, total_prot = st.session_state.meal_totals
 
     # -------------------------
     # DAILY TARGET CHARTS
@@ -185,9 +217,11 @@ def main():
         st.session_state.meals.append(
             {"meal": meal_name, "calories": float(meal_cal), "protein": float(meal_prot)}
         )
+        st.session_state.meal_totals = (total_cal + float(meal_cal), total_prot + float(meal_prot))
 
     if st.button("Reset meals"):
         st.session_state.meals = []
+        st.session_state.meal_totals = (0.0, 0.0)
 
     if st.session_state.meals:
         st.markdown("### Logged meals")
@@ -1,5 +1,6 @@
 import ast
 import json
+import re
 from fractions import Fraction
 from collections import Counter
 from datetime import date
@@ -13,7 +14,7 @@ import matplotlib.pyplot as plt
 from sklearn.linear_model import LinearRegression
 from sklearn.model_selection import train_test_split
 
-from database import get_profile
+from database import current_profile
 
 PRIMARY_COLOR = "#007A3D"
 
@@ -34,29 +35,53 @@ def to_float(x):
 CSV_URL = "https://raw.githubusercontent.com/philippdmt/Protein_and_Calories/refs/heads/main/calories.csv"
 
 def determine_training_type(hr, age):
-    if hr >= 0.6 * (220 - age):
-        return "Cardio"
-    return "Kraft"
+    # element-wise over whole columns instead of a row-by-row apply
+    return np.where(hr >= 0.6 * (220 - age), "Cardio", "Kraft")
 
 @st.cache_data
-def load_and_train_model():
+def load_calories_csv():
     try:
-        df = pd.read_csv("calories.csv")
+        return pd.read_csv("calories.csv")
     except:
-        df = pd.read_csv(CSV_URL)
+        return pd.read_csv(CSV_URL)
+
+@st.cache_data
+def load_training_data():
+    df = load_calories_csv()
 
-    df["Training_Type"] = df.apply(lambda r: determine_training_type(r["Heart_Rate"], r["Age"]), axis=1)
+    df["Training_Type"] = determine_training_type(df["Heart_Rate"], df["Age"])
 
     y = df["Calories"]
     X = df.drop(columns=["User_ID", "Heart_Rate", "Body_Temp", "Calories"])
 
     X = pd.get_dummies(X, columns=["Gender", "Training_Type"], drop_first=False)
+    return X, y
+
+@st.cache_resource
+def load_and_train_model():
+    X, y = load_training_data()
 
     model = LinearRegression()
     model.fit(X, y)
 
     return model, X.columns.tolist()
 
+# linear model: predict = intercept + coef . x, with the feature positions looked up once
+@st.cache_resource
+def model_coefficients():
+    model, feature_cols = load_and_train_model()
+    col_idx = {name: i for i, name in enumerate(feature_cols)}
+    return model.coef_, float(model.intercept_), col_idx
+
+def predict_training_kcal(person):
+    coef, intercept, col_idx = model_coefficients()
+    x = np.zeros(len(coef))
+    for name, value in person.items():
+        i = col_idx.get(name)
+        if i is not None and value is not None:  # unknown keys and missing values count as 0
+            x[i] = value
+    return float(x @ coef + intercept)
+
 def grundumsatz(age, weight, height, gender):
     if gender.lower() == "male":
         return 10*weight + 6.25*height - 5*age + 5
@@ -104,31 +129,35 @@ def float_to_fraction_str(x):
         return f"{f.numerator}"
     return f"{f.numerator}/{f.denominator}"
 
+# spaced out so "1½" reads as "1 1/2"
+_FRAC_TRANS = str.maketrans({k: " " + v + " " for k, v in UNICODE_FRACTIONS.items()})
+
+# one leading run of quantity tokens ("2", "1 1/2", ".5") per line, same forms Fraction accepts;
+# lines are run through _FRAC_TRANS first, so no Unicode glyphs are left to handle here
+_QTY_TOKEN = r"[-+]?(?:\d+/\d*[1-9]\d*|(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?)"
+_QTY_RE = re.compile(rf"\s*((?:(?:{_QTY_TOKEN})(?!\S)\s*)+)")
+
 def parse_quantity_token(tok):
-    if tok in UNICODE_FRACTIONS:
-        tok = UNICODE_FRACTIONS[tok]
     try:
         return float(Fraction(tok))
-    except:
+    except (ValueError, ZeroDivisionError, OverflowError):
         return None
 
 def split_quantity_from_line(line):
-    if not line:
-        return None, line
-    tokens = line.split()
-    qty_tokens=[]
-    rest=[]
-    for i,t in enumerate(tokens):
-        val = parse_quantity_token(t)
-        if val is not None and not rest:
-            qty_tokens.append(t)
-        else:
-            rest = tokens[i:]
-            break
-    if not qty_tokens:
+    m = _QTY_RE.match(line) if line else None
+    if m is None:
         return None, line
-    qty = sum(parse_quantity_token(q) for q in qty_tokens)
-    rest=" ".join(rest)
+    tokens = m.group(1).split()
+    qty = 0.0
+    for i, tok in enumerate(tokens):
+        val = parse_quantity_token(tok)
+        if val is None:
+            # too large for a float ("1e999"): the quantity stops here, as before
+            if i == 0:
+                return None, line
+            return qty, " ".join(tokens[i:] + line[m.end():].split())
+        qty += val
+    rest = " ".join(line[m.end():].split())
     return qty, rest
 
 def scale_ingredient_lines(lines, factor):
@@ -155,16 +184,24 @@ DATA_URL = (
 def load_recipes():
     df = pd.read_csv(DATA_URL)
 
-    def get_nutr(json_str, k):
+    # parse each row's JSON once and pull all three totals out of it
+    def get_nutrs(json_str):
         try:
             d = json.loads(json_str)
-            return float(d[k]["quantity"]) if k in d else None
         except:
-            return None
-
-    df["protein_total"] = df["total_nutrients"].apply(lambda x: get_nutr(x,"PROCNT"))
-    df["fat_total"]     = df["total_nutrients"].apply(lambda x: get_nutr(x,"FAT"))
-    df["carbs_total"]   = df["total_nutrients"].apply(lambda x: get_nutr(x,"CHOCDF"))
+            return (None, None, None)
+        out = []
+        for k in ("PROCNT", "FAT", "CHOCDF"):
+            try:
+                out.append(float(d[k]["quantity"]) if k in d else None)
+            except:
+                out.append(None)
+        return tuple(out)
+
+    totals = [get_nutrs(x) for x in df["total_nutrients"].to_numpy()]
+    df["protein_total"] = [t[0] for t in totals]
+    df["fat_total"]     = [t[1] for t in totals]
+    df["carbs_total"]   = [t[2] for t in totals]
 
     df = df.dropna(subset=["protein_total","fat_total","carbs_total","calories","servings"])
 
@@ -189,7 +226,10 @@ def load_recipes():
             pass
         return [p.strip().lower() for p in str(x).split(",")]
 
-    df["ingredients_list"] = df["ingredients"].apply(parse_ing)
+    df["ingredients_list"] = [parse_ing(x) for x in df["ingredients"].to_numpy()]
+    # one string per recipe, so substring filters run as vectorised str.contains;
+    # "term in any ingredient" == "term in the joined text" as terms never contain "\n"
+    df["ingredients_text"] = ["\n".join(ing) for ing in df["ingredients_list"]]
 
     # Ingredient lines
     def parse_lines(x):
@@ -201,11 +241,19 @@ def load_recipes():
             pass
         return [str(x)]
 
-    df["ingredient_lines_parsed"] = df["ingredient_lines"].apply(parse_lines)
-    df["ingredient_lines_per_serving"] = df.apply(
-        lambda r: scale_ingredient_lines(r["ingredient_lines_parsed"], 1/float(r["servings"])),
-        axis=1
-    )
+    # Unicode fractions swapped for plain ones in one translate per line, before any quantity parsing
+    df["ingredient_lines_parsed"] = [
+        [line.translate(_FRAC_TRANS) for line in parse_lines(x)] for x in df["ingredient_lines"].to_numpy()
+    ]
+    # zip over the two columns instead of apply(axis=1), which builds a Series per row
+    df["ingredient_lines_per_serving"] = [
+        scale_ingredient_lines(lines, 1/s)
+        for lines, s in zip(df["ingredient_lines_parsed"].to_numpy(), df["servings"].to_numpy(dtype=float))
+    ]
+
+    # diet flags computed once instead of a str.contains scan per filter call
+    df["is_vegan"] = df["diet_labels"].str.contains("vegan", case=False, na=False)
+    df["is_vegetarian"] = df["diet_labels"].str.contains("vegetarian", case=False, na=False)
 
     # meal_type fallback
     if "meal_type" not in df.columns:
@@ -218,23 +266,44 @@ def load_recipes():
 # -------------------------------------------------------
 # FILTERING + MEAL PICKING
 # -------------------------------------------------------
-def filter_recipes(df, diet_pref, allergies):
-    diet_pref = (diet_pref or "No preference").lower()
-    allergies = [a.strip().lower() for a in allergies if a]
+def contains_term(df, term):
+    return df["ingredients_text"].str.contains(term, regex=False).to_numpy(dtype=bool)
+
+def contains_any_term(df, terms):
+    mask = np.zeros(len(df), dtype=bool)
+    for t in terms:
+        mask |= contains_term(df, t)
+    return mask
+
+def filter_key(diet_pref, allergies):
+    # normalised (diet, allergies) so equivalent profiles share one cache entry
+    return (
+        (diet_pref or "No preference").lower(),
+        tuple(sorted({a.strip().lower() for a in allergies if a.strip()})),
+    )
 
-    base = df.copy()
+def filter_mask(df, diet, allergies):
+    # one boolean mask over the frame instead of copying it and narrowing step by step
+    if diet == "vegan":
+        mask = df["is_vegan"].to_numpy(dtype=bool, copy=True)
+    elif diet == "vegetarian":
+        mask = df["is_vegetarian"].to_numpy(dtype=bool, copy=True)
+    else:
+        mask = np.ones(len(df), dtype=bool)
+    if allergies:
+        mask &= ~contains_any_term(df, allergies)
+    return mask
 
-    if diet_pref == "vegan":
-        base = base[base["diet_labels"].str.contains("vegan",case=False,na=False)]
-    elif diet_pref == "vegetarian":
-        base = base[base["diet_labels"].str.contains("vegetarian",case=False,na=False)]
+def filter_recipes(df, diet_pref, allergies):
+    return df[filter_mask(df, *filter_key(diet_pref, allergies))]
 
-    if allergies:
-        base = base[base["ingredients_list"].apply(
-            lambda ing: not any(a in x for a in allergies for x in ing)
-        )]
+# keyed on the normalised profile only (the frame is always load_recipes()), bounded across sessions
+@st.cache_data(max_entries=64, show_spinner=False)
+def _cached_filter_mask(_df, diet, allergies):
+    return filter_mask(_df, diet, allergies)
 
-    return base
+def filter_recipes_cached(df, diet_pref, allergies):
+    return df[_cached_filter_mask(df, *filter_key(diet_pref, allergies))]
 
 class UserPreferenceModel:
     def __init__(self):
@@ -255,6 +324,17 @@ class UserPreferenceModel:
             total -= self.disliked.get(ing,0)
         return total
 
+    def score_all(self, ing_lists):
+        # same as score() per row, without building a Series for every row
+        if not self.liked and not self.disliked:
+            return np.zeros(len(ing_lists), dtype=np.int64)
+        weights = Counter(self.liked)
+        weights.subtract(self.disliked)
+        return np.fromiter(
+            (sum(weights.get(ing, 0) for ing in ings) for ings in ing_lists),
+            dtype=np.int64, count=len(ing_lists),
+        )
+
 def pick_meal(df, meal_type, target, pref_model):
     subset = df[df["meal_type"].astype(str).str.contains(meal_type,case=False,na=False)]
     if subset.empty:
@@ -264,7 +344,7 @@ def pick_meal(df, meal_type, target, pref_model):
     subset["cal_diff"] = (subset["calories_per_serving"] - target).abs()
 
     if pref_model:
-        subset["score"] = subset.apply(pref_model.score, axis=1)
+        subset["score"] = pref_model.score_all(subset["ingredients_list"].to_numpy())
         subset = subset.sort_values(["score","cal_diff"], ascending=[False,True])
     else:
         subset = subset.sort_values("cal_diff")
@@ -339,7 +419,7 @@ def main():
         st.error("Please log in first.")
         return
 
-    user = get_profile(st.session_state.user_id)
+    user = current_profile(st.session_state.user_id)
 
     # safe profile conversion
     age    = to_float(user.get("age"))
@@ -364,7 +444,7 @@ def main():
         st.session_state.daily_plan = None
 
     # ML model
-    model, feature_cols = load_and_train_model()
+    model_coefficients()
 
     # workout data
     wo = st.session_state.get("current_workout")
@@ -390,11 +470,8 @@ def main():
         "Training_Type_Kraft":  1 if training_type=="Kraft" else 0,
     }
 
-    dfp = pd.DataFrame([person]).reindex(columns=feature_cols, fill_value=0)
-    dfp = dfp.fillna(0)
-
     try:
-        training_kcal = float(model.predict(dfp)[0]) if wo else 0
+        training_kcal = predict_training_kcal(person) if wo else 0
     except:
         training_kcal=0
 
@@ -465,7 +542,7 @@ def main():
         st.subheader("Daily Recipe Plan")
 
         if st.button("Generate daily plan"):
-            user_df = filter_recipes(recipes, diet_pref, allergies)
+            user_df = filter_recipes_cached(recipes, diet_pref, allergies)
             plan = {
                 "Breakfast": pick_meal(user_df, "breakfast", target_cal*0.25, st.session_state.pref_model),
                 "Lunch":     pick_meal(user_df, "lunch",     target_cal*0.40, st.session_state.pref_model),
@@ -498,17 +575,13 @@ def main():
         max_cal = st.number_input("Max calories",0,3000,800)
 
         if st.button("Search"):
-            df = filter_recipes(recipes, diet_pref, allergies)
+            df = filter_recipes_cached(recipes, diet_pref, allergies)
             if meal_t!="all":
                 df = df[df["meal_type"].str.contains(meal_t,case=False,na=False)]
-            if inc_l:
-                df = df[df["ingredients_list"].apply(
-                    lambda ing: all(any(i in x for x in ing) for i in inc_l)
-                )]
+            for i in inc_l:
+                df = df[contains_term(df, i)]
             if exc_l:
-                df = df[df["ingredients_list"].apply(
-                    lambda ing: not any(any(e in x for x in ing) for e in exc_l)
-                )]
+                df = df[~contains_any_term(df, exc_l)]
             df = df[df["calories_per_serving"] <= max_cal]
 
             if df.empty:
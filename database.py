@@ -1,181 +1,270 @@
 import sqlite3
 import hashlib
+import hmac
+import os
 import re
+import threading
 
+import streamlit as st
+
+# one connection per process, shared by all sessions and by app.py; only use it under db_lock()
+@st.cache_resource
 def get_db():
-    conn = sqlite3.connect("gym_app.db")
+    conn = sqlite3.connect("gym_app.db", check_same_thread=False)
+    conn.row_factory = sqlite3.Row  # rows unpack like tuples and convert with dict(row)
     conn.execute("PRAGMA foreign_keys = 1")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA cache_size = -20000")  # ~20 MB page cache
     return conn
 
+@st.cache_resource
+def db_lock():
+    return threading.Lock()
+
+@st.cache_resource
 def create_tables():
-    conn = get_db()
-    cur = conn.cursor()
-
-    # Users table
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            email TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL
+    # schema bootstrap, runs once per process
+    with db_lock():
+        conn = get_db()
+        cur = conn.cursor()
+
+        # Users table
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                email TEXT UNIQUE NOT NULL,
+                password_hash TEXT NOT NULL
+            )
+            """
         )
-        """
-    )
-
-    # Profiles table
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS profiles (
-            user_id INTEGER UNIQUE,
-            age INTEGER,
-            weight REAL,
-            height REAL,
-            username TEXT,
-            allergies TEXT,
-            training_type TEXT,
-            diet_preferences TEXT,
-            gender TEXT,
-            goal TEXT,
-            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+
+        # case-insensitive email lookups
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_users_email_lower ON users(lower(email))")
+
+        # Profiles table
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS profiles (
+                user_id INTEGER UNIQUE,
+                age INTEGER,
+                weight REAL,
+                height REAL,
+                username TEXT,
+                allergies TEXT,
+                training_type TEXT,
+                diet_preferences TEXT,
+                gender TEXT DEFAULT 'Male',
+                goal TEXT DEFAULT 'Maintain',
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            )
+            """
         )
-        """
-    )
 
-    # Add columns if missing
-    for col in ["username", "allergies", "training_type", "diet_preferences", "gender", "goal"]:
-        try:
-            cur.execute(f"ALTER TABLE profiles ADD COLUMN {col} TEXT")
-        except sqlite3.OperationalError:
-            pass
+        # Add columns if missing
+        existing = {row[1] for row in cur.execute("PRAGMA table_info(profiles)")}
+        for col_def in [
+            "username TEXT",
+            "allergies TEXT",
+            "training_type TEXT",
+            "diet_preferences TEXT",
+            "gender TEXT DEFAULT 'Male'",
+            "goal TEXT DEFAULT 'Maintain'",
+        ]:
+            if col_def.split()[0] not in existing:
+                cur.execute(f"ALTER TABLE profiles ADD COLUMN {col_def}")
+
+        conn.commit()
 
-    conn.commit()
-    conn.close()
+# password hashing + validation live here; app.py imports them, so both write the same format
+SCRYPT_PARAMS = {"n": 2**14, "r": 8, "p": 1}
 
 def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
+    salt = os.urandom(16)
+    digest = hashlib.scrypt(password.encode(), salt=salt, **SCRYPT_PARAMS)
+    return f"scrypt${salt.hex()}${digest.hex()}"
+
+def check_password(password: str, stored_hash: str) -> bool:
+    if stored_hash.startswith("scrypt$"):
+        parts = stored_hash.split("$")
+        # a malformed entry can never match, so don't spend a scrypt run on it
+        if len(parts) != 3 or len(parts[1]) != 32 or len(parts[2]) != 128:
+            return False
+        try:
+            salt = bytes.fromhex(parts[1])
+        except ValueError:
+            return False
+        candidate = hashlib.scrypt(password.encode(), salt=salt, **SCRYPT_PARAMS)
+        return hmac.compare_digest(candidate.hex(), parts[2])
+    # old unsalted SHA256 entries
+    if len(stored_hash) != 64:
+        return False
+    return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored_hash)
+
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+# character classes as bit flags, checked in this order (first missing one is reported)
+PW_LOWER, PW_UPPER, PW_DIGIT, PW_SPECIAL = 1, 2, 4, 8
+PW_ALL = PW_LOWER | PW_UPPER | PW_DIGIT | PW_SPECIAL
+PW_MESSAGES = (
+    (PW_LOWER, "Password must contain at least one lowercase letter."),
+    (PW_UPPER, "Password must contain at least one uppercase letter."),
+    (PW_DIGIT, "Password must contain at least one digit."),
+    (PW_SPECIAL, "Password must contain at least one special character (e.g. !, ?, #, ...)."),
+)
 
 def validate_password_strength(password: str):
     if len(password) < 8:
         return False, "Password must be at least 8 characters long."
-    if not re.search(r"[a-z]", password):
-        return False, "Password must contain at least one lowercase letter."
-    if not re.search(r"[A-Z]", password):
-        return False, "Password must contain at least one uppercase letter."
-    if not re.search(r"[0-9]", password):
-        return False, "Password must contain at least one digit."
-    if not re.search(r"[^A-Za-z0-9]", password):
-        return False, "Password must contain at least one special character."
+    # one pass collects all character classes
+    flags = 0
+    for c in password:
+        if "a" <= c <= "z":
+            flags |= PW_LOWER
+        elif "A" <= c <= "Z":
+            flags |= PW_UPPER
+        elif "0" <= c <= "9":
+            flags |= PW_DIGIT
+        else:
+            flags |= PW_SPECIAL
+        if flags == PW_ALL:
+            return True, ""
+    for flag, message in PW_MESSAGES:
+        if not flags & flag:
+            return False, message
     return True, ""
 
 def is_valid_email(email: str) -> bool:
-    pattern = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
-    return re.match(pattern, email) is not None
+    return EMAIL_RE.match(email) is not None
+
+# hot-path queries as constants: sqlite3's statement cache is keyed on the SQL text;
+# emails are stored lowercased, lower(email) also matches older mixed-case rows (idx_users_email_lower)
+SQL_VERIFY_USER = "SELECT id, password_hash FROM users WHERE lower(email) = ?"
+SQL_FIND_USER = "SELECT id FROM users WHERE lower(email) = ?"
 
 def register_user(email: str, password: str):
-    conn = get_db()
-    cur = conn.cursor()
-    try:
-        cur.execute(
-            "INSERT INTO users (email, password_hash) VALUES (?, ?)",
-            (email, hash_password(password)),
-        )
-        user_id = cur.lastrowid
-        cur.execute(
-            """
-            INSERT INTO profiles (
-                user_id, age, weight, height, username,
-                allergies, training_type, diet_preferences,
-                gender, goal
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (user_id, None, None, None, None, None, None, None, "Male", "Maintain"),
-        )
-        conn.commit()
-        conn.close()
-        return True, "Account created.", user_id
-    except sqlite3.IntegrityError:
-        conn.close()
-        return False, "An account with this email already exists.", None
+    # returns (ok, msg, user_id)
+    email = email.lower()
+    password_hash = hash_password(password)
+    with db_lock():
+        conn = get_db()
+        try:
+            # one transaction for both rows; rolled back on a duplicate email
+            with conn:
+                if conn.execute(SQL_FIND_USER, (email,)).fetchone():
+                    return False, "An account with this email already exists.", None
+                user_id = conn.execute(
+                    "INSERT INTO users (email, password_hash) VALUES (?, ?)",
+                    (email, password_hash),
+                ).lastrowid
+                conn.execute(
+                    "INSERT INTO profiles (user_id, gender, goal) VALUES (?, ?, ?)",
+                    (user_id, "Male", "Maintain"),
+                )
+            return True, "Account created.", user_id
+        except sqlite3.IntegrityError:
+            return False, "An account with this email already exists.", None
 
 def verify_user(email: str, password: str):
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute("SELECT id, password_hash FROM users WHERE email = ?", (email,))
-    row = cur.fetchone()
-    conn.close()
+    with db_lock():
+        row = get_db().execute(SQL_VERIFY_USER, (email.lower(),)).fetchone()
     if row is None:
         return None
     user_id, stored_hash = row
-    if stored_hash == hash_password(password):
-        return user_id
-    return None
+    if not check_password(password, stored_hash):
+        return None
+    # upgrade old SHA256 hashes now that we know the password
+    if not stored_hash.startswith("scrypt$"):
+        new_hash = hash_password(password)
+        with db_lock():
+            conn = get_db()
+            conn.execute("UPDATE users SET password_hash = ? WHERE id = ?", (new_hash, user_id))
+            conn.commit()
+    return user_id
 
 def reset_password(email: str, new_password: str):
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute("SELECT id FROM users WHERE email = ?", (email,))
-    row = cur.fetchone()
-    if row is None:
-        conn.close()
-        return False, "No account found with this email."
-    cur.execute("UPDATE users SET password_hash = ? WHERE email = ?", (hash_password(new_password), email))
-    conn.commit()
-    conn.close()
+    # demo version: no email verification
+    password_hash = hash_password(new_password)
+    with db_lock():
+        conn = get_db()
+        row = conn.execute(SQL_FIND_USER, (email.lower(),)).fetchone()
+        if row is None:
+            return False, "No account found with this email."
+        conn.execute("UPDATE users SET password_hash = ? WHERE id = ?", (password_hash, row[0]))
+        conn.commit()
     return True, "Password updated successfully."
 
-def get_profile(user_id: int):
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT age, weight, height,
-               username, allergies, training_type, diet_preferences,
-               gender, goal
-        FROM profiles WHERE user_id = ?
-        """,
-        (user_id,),
-    )
-    row = cur.fetchone()
-    conn.close()
+DEFAULT_PROFILE = {
+    "age": None,
+    "weight": None,
+    "height": None,
+    "username": None,
+    "allergies": None,
+    "training_type": None,
+    "diet_preferences": None,
+    "gender": "Male",
+    "goal": "Maintain",
+}
+
+# profile reads, caching and invalidation live here only; app.py and the pages go through them
+def profile_from_row(row):
     if row:
-        return {
-            "age": row[0],
-            "weight": row[1],
-            "height": row[2],
-            "username": row[3],
-            "allergies": row[4],
-            "training_type": row[5],
-            "diet_preferences": row[6],
-            "gender": row[7] or "Male",
-            "goal": row[8] or "Maintain",
-        }
-    return {
-        "age": None,
-        "weight": None,
-        "height": None,
-        "username": None,
-        "allergies": None,
-        "training_type": None,
-        "diet_preferences": None,
-        "gender": "Male",
-        "goal": "Maintain",
-    }
+        profile = dict(row)
+        profile["gender"] = profile["gender"] or "Male"
+        profile["goal"] = profile["goal"] or "Maintain"
+        return profile
+    return dict(DEFAULT_PROFILE)
+
+# cached per user for a minute; update_profile (the only profile writer) drops the entry
+@st.cache_data(ttl=60, show_spinner=False)
+def _get_profile_cached(user_id: int):
+    with db_lock():
+        row = get_db().execute(
+            """
+            SELECT age, weight, height,
+                   username, allergies, training_type, diet_preferences,
+                   gender, goal
+            FROM profiles WHERE user_id = ?
+            """,
+            (user_id,),
+        ).fetchone()
+    return profile_from_row(row)
+
+def get_profile(user_id: int):
+    # st.cache_data hands out a fresh copy per call, so callers may mutate it
+    return _get_profile_cached(user_id)
+
+def current_profile(user_id: int):
+    # the logged-in user's profile is kept in session state; app.py replaces it on save
+    profile = st.session_state.get("profile")
+    if profile is None:
+        profile = st.session_state["profile"] = get_profile(user_id)
+    return profile
 
 def update_profile(user_id: int, age: int, weight: float, height: float,
                    username: str, allergies: str, training_type: str,
                    diet_preferences: str, gender: str, goal: str):
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        UPDATE profiles
-        SET age = ?, weight = ?, height = ?,
-            username = ?, allergies = ?,
-            training_type = ?, diet_preferences = ?,
-            gender = ?, goal = ?
-        WHERE user_id = ?
-        """,
-        (age, weight, height, username, allergies, training_type, diet_preferences, gender, goal, user_id)
-    )
-    conn.commit()
-    conn.close()
+    # returns the stored profile; RETURNING hands back the saved row, so no SELECT is needed
+    with db_lock():
+        conn = get_db()
+        row = conn.execute(
+            """
+            UPDATE profiles
+            SET age = ?, weight = ?, height = ?,
+                username = ?, allergies = ?,
+                training_type = ?, diet_preferences = ?,
+                gender = ?, goal = ?
+            WHERE user_id = ?
+            RETURNING age,
+                      -- RETURNING skips the REAL affinity, so 0.0 would come back as int 0
+                      CAST(weight AS REAL) AS weight, CAST(height AS REAL) AS height,
+                      username, allergies, training_type, diet_preferences,
+                      gender, goal
+            """,
+            (age, weight, height, username, allergies, training_type, diet_preferences, gender, goal, user_id)
+        ).fetchone()
+        conn.commit()
+    _get_profile_cached.clear(user_id)
+    return profile_from_row(row)
@@ -1,31 +1,26 @@
 import ast
 import json
+import math
+import os
+import pickle
+import re
+import sys
 from fractions import Fraction
-from collections import Counter
+from functools import lru_cache
+from itertools import chain
 from typing import List, Optional
 from datetime import date
-from database import get_profile
+from database import current_profile
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
-# ===================== PAGE CONFIG =====================
-st.set_page_config(
-    page_title="Nutrition Advisory",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-st.markdown(
-    """
-    <style>
-    .css-1d391kg, .css-1avcm0n {
-        max-width: 100%;
-    }
-    </style>
-    """,
-    unsafe_allow_html=True
-)
+try:
+    import pyarrow  # noqa: F401  (optional: Arrow-backed strings for the ingredient scans)
+    SEARCH_STRING_DTYPE = "string[pyarrow]"
+except ImportError:
+    SEARCH_STRING_DTYPE = "string"
 
 # =============================================================================
 # CONFIG
@@ -35,23 +30,43 @@ DATA_URL = (
     "/resolve/main/recipes-with-nutrition.csv"
 )
 
+# written by prepare_data.py; used instead of DATA_URL when present and current.
+# Next to this module, so it is found whatever directory streamlit is started from.
+PREPARED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recipes_prepared.pkl")
+# bump when prepare_recipes changes the columns it produces or their contents
+PREPARED_FORMAT = 2
+
 HIGH_PROTEIN_MIN = 25
 MAX_CALORIES_PER_SERVING = 800
+PICK_MEAL_CANDIDATES = 200
+
+# only these columns of the recipe CSV are used; the rest is never parsed
+RECIPE_COLUMNS = {
+    "recipe_name", "url", "image_url", "calories", "servings", "total_nutrients",
+    "ingredients", "ingredient_lines", "diet_labels", "meal_type",
+}
+RECIPE_DTYPES = {"calories": "float64", "diet_labels": "string", "meal_type": "string"}
+
+_rng = np.random.default_rng()
 
 # =============================================================================
 # USER PREFERENCE MODEL
 # =============================================================================
 class UserPreferenceModel:
     def __init__(self):
-        self.liked_ingredients = Counter()
-        self.disliked_ingredients = Counter()
+        self.liked_ingredients = {}
+        self.disliked_ingredients = {}
 
     def update_with_rating(self, recipe_row: pd.Series, rating: int):
         ings = recipe_row.get("ingredients_list", [])
         if rating > 0:
-            self.liked_ingredients.update(ings)
+            counts = self.liked_ingredients
         elif rating < 0:
-            self.disliked_ingredients.update(ings)
+            counts = self.disliked_ingredients
+        else:
+            return
+        for ing in ings:
+            counts[ing] = counts.get(ing, 0) + 1
 
     def score_recipe(self, recipe_row: pd.Series) -> float:
         ings = recipe_row.get("ingredients_list", [])
@@ -61,6 +76,25 @@ class UserPreferenceModel:
             score -= self.disliked_ingredients.get(ing, 0)
         return score
 
+    def score_series(self, ing_lists: pd.Series) -> np.ndarray:
+        """Score every ingredient list at once (same result as score_recipe per row)."""
+        if not self.liked_ingredients and not self.disliked_ingredients:
+            return np.zeros(len(ing_lists))
+
+        ids, offsets, vocab = build_ingredient_index(ing_lists)
+        weights = np.zeros(len(vocab))
+        for counts, sign in ((self.liked_ingredients, 1.0), (self.disliked_ingredients, -1.0)):
+            if not counts:
+                continue
+            pos = vocab.get_indexer(list(counts))
+            hit = pos >= 0
+            values = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+            np.add.at(weights, pos[hit], sign * values[hit])
+
+        n_rows = len(offsets) - 1
+        rows = np.repeat(np.arange(n_rows), np.diff(offsets))
+        return np.bincount(rows, weights=weights[ids], minlength=n_rows).astype(np.float64, copy=False)
+
 
 # =============================================================================
 # INGREDIENT PARSING
@@ -74,16 +108,36 @@ UNICODE_FRACTIONS = {
     "⅛": "1/8", "⅜": "3/8", "⅝": "5/8", "⅞": "7/8",
 }
 
+# scaled quantities repeat a lot across recipes (1/2, 1/4, 2/3, ...), so memoize the formatting;
+# bounded, since the server keeps this for its whole lifetime
+@lru_cache(maxsize=4096)
 def float_to_fraction_str(x: float, max_denominator: int = 16) -> str:
     f = Fraction(x).limit_denominator(max_denominator)
-    if f.denominator == 1:
-        return str(f.numerator)
-    return f"{f.numerator}/{f.denominator}"
+    return str(f.numerator) if f.denominator == 1 else f"{f.numerator}/{f.denominator}"
+
+# plain "2", "1.5", ".5" or "3/4" tokens; anything else goes through Fraction
+_QTY_RE = re.compile(r"(\d+)/(\d+)|\d+(?:\.\d*)?|\.\d+")
+_DIGIT_RE = re.compile(r"\d")
 
 def parse_quantity_token(token: str):
     token = token.strip()
     if token in UNICODE_FRACTIONS:
         token = UNICODE_FRACTIONS[token]
+    m = _QTY_RE.fullmatch(token)
+    if m is not None:
+        num, den = m.group(1), m.group(2)
+        try:
+            if den is None:
+                value = float(token)
+            else:
+                den = int(den)
+                value = int(num) / den if den else None
+        except (OverflowError, ValueError):
+            return None
+        # hundreds of digits overflow to inf; like the Fraction path, that is not a quantity
+        return value if value is not None and math.isfinite(value) else None
+    if _DIGIT_RE.search(token) is None:
+        return None
     try:
         return float(Fraction(token))
     except Exception:
@@ -93,30 +147,31 @@ def split_quantity_from_line(line: str):
     if not line:
         return None, line
     tokens = line.split()
-    qty_tokens = []
-    rest_tokens = []
-    for i, tok in enumerate(tokens):
-        val = parse_quantity_token(tok)
-        if val is not None and not rest_tokens:
-            qty_tokens.append(tok)
-        else:
-            rest_tokens = tokens[i:]
+    n_tokens = len(tokens)
+    qty = 0.0
+    i = 0
+    while i < n_tokens:
+        val = parse_quantity_token(tokens[i])
+        if val is None:
             break
-    if not qty_tokens:
+        qty += val
+        i += 1
+    if i == 0:
         return None, line
 
-    qty = sum(parse_quantity_token(t) for t in qty_tokens)
-    rest = " ".join(rest_tokens).strip()
+    rest = " ".join(tokens[i:]).strip()
     return qty, rest
 
 def scale_ingredient_lines(lines, factor: float):
+    # single-serving recipes skip the multiply but still get the same fraction formatting
+    unscaled = factor == 1.0
     scaled = []
     for line in lines:
         qty, rest = split_quantity_from_line(line)
         if qty is None:
             scaled.append(line)
             continue
-        new_qty = qty * factor
+        new_qty = qty if unscaled else qty * factor
         scaled.append(f"{float_to_fraction_str(new_qty)} {rest}".strip())
     return scaled
 
@@ -124,31 +179,97 @@ def scale_ingredient_lines(lines, factor: float):
 # =============================================================================
 # DATA HELPERS
 # =============================================================================
-def get_nutrient(nutrient_json, key):
+MACRO_KEYS = ("PROCNT", "FAT", "CHOCDF")
+MACRO_COLUMNS = ["protein_g_total", "fat_g_total", "carbs_g_total"]
+
+def get_macros(nutrient_json):
+    """Parse the nutrient JSON once and return (protein, fat, carbs); NaN where missing."""
     try:
         data = json.loads(nutrient_json)
-        if key in data and "quantity" in data[key]:
-            return float(data[key]["quantity"])
     except Exception:
-        return None
-    return None
+        return (np.nan, np.nan, np.nan)
+    macros = []
+    for key in MACRO_KEYS:
+        try:
+            macros.append(float(data[key]["quantity"]))
+        except Exception:
+            macros.append(np.nan)
+    return tuple(macros)
+
+def build_ingredient_index(ing_lists: pd.Series):
+    """
+    Flatten ingredient lists into CSR form.
+    Returns (ids, offsets, vocab): row i owns ids[offsets[i]:offsets[i + 1]],
+    and vocab[id] is the ingredient string.
+    """
+    lengths = np.fromiter((len(lst) for lst in ing_lists.values), dtype=np.int64, count=len(ing_lists))
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    flat = np.fromiter(chain.from_iterable(ing_lists.values), dtype=object, count=int(offsets[-1]))
+    codes, uniques = pd.factorize(flat)
+    return codes.astype(np.int32), offsets, pd.Index(uniques)
+
+class IngredientWordIndex:
+    """Inverted index: word -> sorted int32 positions of the recipes whose ingredients contain it."""
+
+    def __init__(self, ing_lists: pd.Series):
+        postings = {}
+        for pos, ings in enumerate(ing_lists.values):
+            for word in set(chain.from_iterable(ing.split() for ing in ings)):
+                postings.setdefault(word, []).append(pos)
+        self.vocab = tuple(sorted(postings))
+        self.postings = {word: np.array(rows, dtype=np.int32) for word, rows in postings.items()}
+        # a term part is matched against the vocabulary once, then served from the cache
+        self.rows_for_part = lru_cache(maxsize=1024)(self._rows_for_part)
+
+    def _rows_for_part(self, part: str) -> np.ndarray:
+        words = [word for word in self.vocab if part in word]
+        if not words:
+            return np.empty(0, dtype=np.int32)
+        rows = np.unique(np.concatenate([self.postings[word] for word in words]))
+        rows.flags.writeable = False  # shared by every caller of the cache
+        return rows
+
+
+def build_ingredient_word_index(ing_lists: pd.Series) -> IngredientWordIndex:
+    return IngredientWordIndex(ing_lists)
+
+def candidate_rows(word_index: IngredientWordIndex, term: str, n_rows: int) -> np.ndarray:
+    """
+    Boolean mask of rows that may contain `term` as a substring: every word of
+    the term has to occur inside some indexed word of the recipe. This is a
+    superset of the real matches, which are then confirmed with contains_any.
+    """
+    candidates = np.ones(n_rows, dtype=bool)
+    for part in term.split():
+        hit = np.zeros(n_rows, dtype=bool)
+        hit[word_index.rows_for_part(part)] = True
+        candidates &= hit
+    return candidates
+
+def parse_list_literal(text: str):
+    """Parse a serialized list, trying the fast JSON decoder before ast.literal_eval."""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return ast.literal_eval(text)
 
 def parse_ingredients_for_allergy(x):
     if pd.isna(x): 
         return []
     try:
-        val = ast.literal_eval(str(x))
+        val = parse_list_literal(str(x))
         if isinstance(val, list):
-            return [str(v.get("text", v)).lower() for v in val]
+            return [sys.intern(str(v.get("text", v)).lower()) for v in val]
     except:
         pass
-    return [p.strip().lower() for p in str(x).split(",") if p.strip()]
+    return [sys.intern(p.strip().lower()) for p in str(x).split(",") if p.strip()]
 
 def parse_ingredient_lines_for_display(x):
     if pd.isna(x):
         return []
     try:
-        val = ast.literal_eval(str(x))
+        val = parse_list_literal(str(x))
         if isinstance(val, list):
             return [str(v).strip() for v in val]
     except:
@@ -156,12 +277,14 @@ def parse_ingredient_lines_for_display(x):
     return [p.strip() for p in str(x).split(",") if p.strip()]
 
 
-@st.cache_data(show_spinner=True)
-def load_and_prepare_data(path_or_url: str) -> pd.DataFrame:
-    df = pd.read_csv(path_or_url)
-    df["protein_g_total"] = df["total_nutrients"].apply(lambda x: get_nutrient(x, "PROCNT"))
-    df["fat_g_total"] = df["total_nutrients"].apply(lambda x: get_nutrient(x, "FAT"))
-    df["carbs_g_total"] = df["total_nutrients"].apply(lambda x: get_nutrient(x, "CHOCDF"))
+def read_recipes_csv(path_or_url: str) -> pd.DataFrame:
+    return pd.read_csv(path_or_url, usecols=lambda c: c in RECIPE_COLUMNS, dtype=RECIPE_DTYPES)
+
+
+def prepare_recipes(df: pd.DataFrame) -> pd.DataFrame:
+    """Add the per-serving / search columns and keep the fitness-friendly recipes."""
+    macros = np.array([get_macros(x) for x in df["total_nutrients"].values], dtype=float).reshape(-1, 3)
+    df[MACRO_COLUMNS] = macros
 
     df = df.dropna(subset=["protein_g_total", "fat_g_total", "carbs_g_total", "calories", "servings"])
 
@@ -178,108 +301,202 @@ def load_and_prepare_data(path_or_url: str) -> pd.DataFrame:
         (df["calories_per_serving"] <= MAX_CALORIES_PER_SERVING)
     ].copy()
 
+    diet_labels_lc = fitness_df["diet_labels"].astype(str).str.lower()
+    fitness_df["is_vegan"] = diet_labels_lc.str.contains("vegan", regex=False, na=False)
+    fitness_df["is_vegetarian"] = diet_labels_lc.str.contains("vegetarian", regex=False, na=False)
+    fitness_df["meal_type_lc"] = fitness_df["meal_type"].astype(str).str.lower()
+
     fitness_df["ingredients_list"] = fitness_df["ingredients"].apply(parse_ingredients_for_allergy)
+    # one searchable string per recipe; "\n" cannot appear in a single-line search term
+    fitness_df["ingredients_joined"] = fitness_df["ingredients_list"].map("\n".join).astype(SEARCH_STRING_DTYPE)
     fitness_df["ingredient_lines_parsed"] = fitness_df["ingredient_lines"].apply(parse_ingredient_lines_for_display)
-    fitness_df["ingredient_lines_per_serving"] = fitness_df.apply(
-        lambda row: scale_ingredient_lines(row["ingredient_lines_parsed"], 1.0 / row["servings"]),
-        axis=1
-    )
+    scale = scale_ingredient_lines
+    fitness_df["ingredient_lines_per_serving"] = [
+        scale(lines, 1.0 / servings)
+        for lines, servings in zip(
+            fitness_df["ingredient_lines_parsed"].values,
+            fitness_df["servings"].values,
+        )
+    ]
     return fitness_df
 
 
+def save_prepared_recipes(df: pd.DataFrame) -> None:
+    pd.to_pickle({"format": PREPARED_FORMAT, "recipes": df}, PREPARED_PATH)
+
+
+def load_prepared_recipes() -> Optional[pd.DataFrame]:
+    """The frame written by prepare_data.py, or None if it is missing, stale or unreadable."""
+    try:
+        # older than this module: prepare_recipes may have changed since it was built
+        if os.path.getmtime(PREPARED_PATH) < os.path.getmtime(__file__):
+            return None
+        prepared = pd.read_pickle(PREPARED_PATH)
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError, TypeError):
+        # truncated file, or pickled by a pandas/numpy this install cannot load: rebuild from the CSV
+        return None
+    if not isinstance(prepared, dict) or prepared.get("format") != PREPARED_FORMAT:
+        return None
+    return prepared["recipes"]
+
+
+@st.cache_resource(show_spinner="Loading recipes…")
+def load_and_prepare_data(path_or_url: str) -> pd.DataFrame:
+    """
+    Load the prepared recipe frame (see prepare_data.py), or build it from the CSV.
+    The frame is cached as a shared resource (no copy per call), so callers
+    must not mutate it in place; derive new frames with masks or .assign().
+    """
+    if path_or_url == DATA_URL:
+        prepared = load_prepared_recipes()
+        if prepared is not None:
+            return prepared
+    return prepare_recipes(read_recipes_csv(path_or_url))
+
+
+@st.cache_resource(show_spinner=False)
+def ingredient_word_index(_df: pd.DataFrame, df_id: int) -> IngredientWordIndex:
+    """Word index for a prepared recipe frame; _df is not hashed, df_id stands in for it."""
+    return build_ingredient_word_index(_df["ingredients_list"])
+
+
 # =============================================================================
 # SEARCH, FILTER, PLAN
 # =============================================================================
-def filter_by_preferences(df: pd.DataFrame, diet_pref: str, allergies: List[str]) -> pd.DataFrame:
+@lru_cache(maxsize=256)
+def terms_pattern(terms: tuple) -> re.Pattern:
+    """One compiled alternation per distinct term tuple, reused across reruns."""
+    return re.compile("|".join(re.escape(t) for t in terms))
+
+
+def contains_any(joined: pd.Series, terms: List[str]) -> np.ndarray:
+    """Boolean mask: True where any of the (lowercase) terms occurs in the joined ingredients."""
+    return joined.str.contains(terms_pattern(tuple(terms)), na=False).to_numpy(dtype=bool)
+
+
+def preference_mask(df: pd.DataFrame, diet_pref: str, allergies: List[str]) -> np.ndarray:
     diet_pref = diet_pref.lower()
     allergies = [a.lower() for a in allergies]
 
-    res = df.copy()
+    mask = np.ones(len(df), dtype=bool)
 
     if diet_pref == "vegan":
-        res = res[res["diet_labels"].str.contains("vegan", case=False, na=False)]
+        mask &= df["is_vegan"].to_numpy(dtype=bool)
     elif diet_pref == "vegetarian":
-        res = res[
-            res["diet_labels"].str.contains("vegetarian", case=False, na=False) |
-            res["diet_labels"].str.contains("vegan", case=False, na=False)
-        ]
+        mask &= df["is_vegetarian"].to_numpy(dtype=bool) | df["is_vegan"].to_numpy(dtype=bool)
 
+    # string scans only run on rows that are still in
     if allergies:
-        res = res[
-            res["ingredients_list"].apply(
-                lambda ing: not any(a in x for a in allergies for x in ing)
-            )
-        ]
+        mask[mask] = ~contains_any(df["ingredients_joined"][mask], allergies)
+
+    return mask
+
 
-    return res
+def filter_by_preferences(df: pd.DataFrame, diet_pref: str, allergies: List[str]) -> pd.DataFrame:
+    return df[preference_mask(df, diet_pref, allergies)]
 
 
-def search_recipes(df, include_ingredients, exclude_ingredients, meal_type, max_calories, diet_pref, allergies, pref_model):
-    base = filter_by_preferences(df, diet_pref, allergies)
+def search_recipes(df, include_ingredients, exclude_ingredients, meal_type, max_calories, diet_pref, allergies, pref_model, word_index=None):
+    """word_index (optional) must have been built from this exact df, see ingredient_word_index."""
+    mask = preference_mask(df, diet_pref, allergies)
 
     include = [i.lower() for i in include_ingredients]
     exclude = [i.lower() for i in exclude_ingredients]
 
     if meal_type != "all":
-        base = base[base["meal_type"].str.contains(meal_type, case=False, na=False)]
+        mask &= df["meal_type_lc"].str.contains(meal_type.lower(), regex=False, na=False).to_numpy(dtype=bool)
 
     if max_calories:
-        base = base[base["calories_per_serving"] <= max_calories]
+        mask &= df["calories_per_serving"].to_numpy() <= max_calories
 
-    if include:
-        base = base[
-            base["ingredients_list"].apply(
-                lambda ing: all(any(i in x for x in ing) for i in include)
-            )
-        ]
+    joined = df["ingredients_joined"]
+    for term in include:
+        if word_index is not None:
+            mask &= candidate_rows(word_index, term, len(df))
+        mask[mask] = contains_any(joined[mask], [term])
 
     if exclude:
-        base = base[
-            base["ingredients_list"].apply(
-                lambda ing: not any(any(e in x for x in ing) for e in exclude)
-            )
-        ]
+        maybe = mask.copy()
+        if word_index is not None:
+            maybe &= np.logical_or.reduce([candidate_rows(word_index, t, len(df)) for t in exclude])
+        mask[maybe] = ~contains_any(joined[maybe], exclude)
+
+    base = df[mask]
 
     if isinstance(pref_model, UserPreferenceModel):
-        base = base.copy()
-        base["score"] = base.apply(pref_model.score_recipe, axis=1)
+        base = base.assign(score=pref_model.score_series(base["ingredients_list"]))
         base = base.sort_values("score", ascending=False)
 
     return base
 
 
 def pick_meal(df, meal_type, target_cal, training_goal, pref_model):
-    base = df[df["meal_type"].str.contains(meal_type, case=False, na=False)]
+    base = df[df["meal_type_lc"].str.contains(meal_type.lower(), regex=False, na=False)]
     if base.empty:
         return None
 
-    base = base.copy()
-    base["cal_diff"] = (base["calories_per_serving"] - target_cal).abs()
+    # rank on plain arrays; the frame itself is only indexed once for the final top 20
+    cal_diff = np.abs(base["calories_per_serving"].to_numpy(dtype=float) - target_cal)
 
     if training_goal == "strength":
-        base = base.sort_values(["protein_g", "cal_diff"], ascending=[False, True])
+        order = np.lexsort((cal_diff, -base["protein_g"].to_numpy(dtype=float)))
     elif training_goal == "endurance":
-        base = base.sort_values(["carbs_g", "cal_diff"], ascending=[False, True])
+        order = np.lexsort((cal_diff, -base["carbs_g"].to_numpy(dtype=float)))
     else:
-        base = base.sort_values("cal_diff")
+        order = np.argsort(cal_diff, kind="stable")
 
     # FIX: Prüfen, ob pref_model korrekt ist
     if isinstance(pref_model, UserPreferenceModel):
-        base["score"] = base.apply(pref_model.score_recipe, axis=1)
-        base = base.sort_values(["score", "cal_diff"], ascending=[False, True])
+        # preferences re-rank the best goal-ranked candidates only, which bounds the scoring cost
+        order = order[:PICK_MEAL_CANDIDATES]
+        score = pref_model.score_series(base["ingredients_list"].iloc[order])
+        order = order[np.lexsort((cal_diff[order], -score))]
 
-    return base.head(20).sample(1).iloc[0]
+    # random pick among the top 20 without building an intermediate frame
+    pick = order[_rng.integers(min(20, len(order)))]
+    meal = base.iloc[pick]
+    meal["cal_diff"] = cal_diff[pick]
+    return meal
 
 
-def recommend_daily_plan(df, daily_calories, training_goal, diet_pref, allergies, pref_model):
-    user_df = filter_by_preferences(df, diet_pref, allergies)
+def preference_hash(pref_model) -> Optional[int]:
+    """Hashable fingerprint of the model's ratings, used as a cache key."""
+    if not isinstance(pref_model, UserPreferenceModel):
+        return None
+    return hash((
+        frozenset(pref_model.liked_ingredients.items()),
+        frozenset(pref_model.disliked_ingredients.items()),
+    ))
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _plan_impl(_df, df_id, plan_date, daily_calories, training_goal, diet_pref, allergies, pref_hash, _pref_model):
+    # _df and _pref_model are not hashed by Streamlit; df_id and pref_hash stand in for them,
+    # plan_date makes the same inputs give one plan per day
+    user_df = filter_by_preferences(_df, diet_pref, list(allergies))
     return {
-        "Breakfast": (pick_meal(user_df, "breakfast", daily_calories * 0.25, training_goal, pref_model), daily_calories * 0.25),
-        "Lunch": (pick_meal(user_df, "lunch", daily_calories * 0.40, training_goal, pref_model), daily_calories * 0.40),
-        "Dinner": (pick_meal(user_df, "dinner", daily_calories * 0.35, training_goal, pref_model), daily_calories * 0.35),
+        "Breakfast": (pick_meal(user_df, "breakfast", daily_calories * 0.25, training_goal, _pref_model), daily_calories * 0.25),
+        "Lunch": (pick_meal(user_df, "lunch", daily_calories * 0.40, training_goal, _pref_model), daily_calories * 0.40),
+        "Dinner": (pick_meal(user_df, "dinner", daily_calories * 0.35, training_goal, _pref_model), daily_calories * 0.35),
     }
 
 
+def recommend_daily_plan(df, daily_calories, training_goal, diet_pref, allergies, pref_model):
+    return _plan_impl(
+        df,
+        id(df),
+        date.today(),
+        daily_calories,
+        training_goal,
+        diet_pref,
+        tuple(allergies),
+        preference_hash(pref_model),
+        pref_model,
+    )
+
+
 # =============================================================================
 # SESSION STATE
 # =============================================================================
@@ -416,13 +633,9 @@ def show_recipe_card(
 def main(df=None):
     init_session_state()
 
-    # Load data
-    if df is None:
-        df = st.session_state.get("recipes_df")
+    # Load data (one shared frame for all sessions, see load_and_prepare_data)
     if df is None:
-        st.info("Loading recipe data...")
         df = load_and_prepare_data(DATA_URL)
-        st.session_state.recipes_df = df
 
     profile = {
         "daily_calories": 2000,
@@ -489,16 +702,32 @@ def main(df=None):
             include_ingredients = [x.strip() for x in include_text.split(",") if x.strip()]
             exclude_ingredients = [x.strip() for x in exclude_text.split(",") if x.strip()]
 
-            st.session_state.search_results = search_recipes(
-                df,
-                include_ingredients,
-                exclude_ingredients,
+            # same query on the same data and ratings -> reuse the last result
+            search_key = (
+                id(df),
+                tuple(include_ingredients),
+                tuple(exclude_ingredients),
                 meal_type,
                 max_cal,
                 profile["diet_pref"],
-                profile["allergies"],
-                st.session_state.pref_model,
+                tuple(profile["allergies"]),
+                preference_hash(st.session_state.pref_model),
             )
+            last_key, last_results = st.session_state.get("_last_search", (None, None))
+            if search_key != last_key:
+                last_results = search_recipes(
+                    df,
+                    include_ingredients,
+                    exclude_ingredients,
+                    meal_type,
+                    max_cal,
+                    profile["diet_pref"],
+                    profile["allergies"],
+                    st.session_state.pref_model,
+                    word_index=ingredient_word_index(df, id(df)),
+                )
+                st.session_state["_last_search"] = (search_key, last_results)
+            st.session_state.search_results = last_results
 
         results = st.session_state.get("search_results")
         if results is None:
@@ -530,10 +759,10 @@ def main(df=None):
     with tab_caltracker:
         st.subheader("Calorie Tracker")
 
-        from calorie_tracker import load_and_train_model, grundumsatz, donut_chart
+        from calorie_tracker import model_coefficients, predict_training_kcal, grundumsatz, donut_chart
 
         try:
-            model, feature_columns = load_and_train_model()
+            model_coefficients()
         except Exception as e:
             st.error("Error loading ML model.")
             st.exception(e)
@@ -544,7 +773,7 @@ def main(df=None):
             st.error("Please log in first.")
             return
 
-        user = get_profile(user_id)
+        user = current_profile(user_id)
         if not user:
             st.error("Could not load user profile.")
             return
@@ -584,10 +813,8 @@ def main(df=None):
             "Training_Type_Kraft": 1 if training_type == "kraft" else 0,
         }
 
-        person_df = pd.DataFrame([person]).reindex(columns=feature_columns, fill_value=0)
-
         try:
-            training_kcal = float(model.predict(person_df)[0])
+            training_kcal = predict_training_kcal(person)
         except:
             training_kcal = 0
 
@@ -670,4 +897,22 @@ def main(df=None):
 
 
 if __name__ == "__main__":
+    # page setup only when run standalone; inside app.py the app owns the page config
+    st.set_page_config(
+        page_title="Nutrition Advisory",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+
+    st.markdown(
+        """
+        <style>
+        .css-1d391kg, .css-1avcm0n {
+            max-width: 100%;
+        }
+        </style>
+        """,
+        unsafe_allow_html=True
+    )
+
     main()
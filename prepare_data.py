@@ -0,0 +1,23 @@
+"""
+Build the prepared recipe frame offline so the app skips the CSV parsing on cold start.
+
+    python prepare_data.py [path_or_url]
+
+Writes PREPARED_PATH, which load_and_prepare_data(DATA_URL) picks up instead of
+downloading and parsing the CSV. The file is ignored once nutrition_advisory.py
+is newer than it or PREPARED_FORMAT changes; re-run it after those or a dataset change.
+"""
+import sys
+
+from nutrition_advisory import DATA_URL, PREPARED_PATH, prepare_recipes, read_recipes_csv, save_prepared_recipes
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else DATA_URL
+    df = prepare_recipes(read_recipes_csv(source))
+    save_prepared_recipes(df)
+    print(f"Wrote {len(df)} recipes to {PREPARED_PATH}")
+
+
+if __name__ == "__main__":
+    main()
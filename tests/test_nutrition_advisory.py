@@ -0,0 +1,14 @@
+from nutrition_advisory import parse_quantity_token, scale_ingredient_lines
+
+
+def test_huge_integer_token_is_not_a_quantity():
+    assert parse_quantity_token("1" * 400) is None
+
+
+def test_huge_fraction_token_is_not_a_quantity():
+    assert parse_quantity_token("1" * 400 + "/3") is None
+
+
+def test_scaling_leaves_huge_quantities_untouched():
+    line = "1" * 400 + " g flour"
+    assert scale_ingredient_lines([line, "2 eggs"], 0.5) == [line, "1 eggs"]